@@ -1,13 +1,20 @@
 """app/api/backtest.py"""
+import asyncio
+from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import Optional
+import orjson
+from app.db.models import BacktestRun
 from app.db.session import get_db
 from app.services.backtester import (
     BacktestEngine, CompositeScoreStrategy, RSIMeanReversionStrategy,
-    GoldenCrossStrategy, FearGreedStrategy
+    GoldenCrossStrategy, FearGreedStrategy,
 )
-from app.models.schemas import BacktestRequest, BacktestResponse, EquityCurvePoint
+from app.services.downsample import downsample_equity_curve
+from app.models.schemas import BacktestRequest, BacktestResponse
 
 router = APIRouter()
 
@@ -18,7 +25,10 @@ STRATEGY_MAP = {
     "fear_greed": FearGreedStrategy,
 }
 
-def result_to_response(result, backtest_id=None):
+def result_to_response(result, backtest_id=None, max_points=None, include_trades=True):
+    equity_curve = result.equity_curve
+    if max_points:
+        equity_curve = downsample_equity_curve(equity_curve, max_points)
     return BacktestResponse(
         coin=result.coin,
         symbol=result.symbol,
@@ -39,19 +49,20 @@ def result_to_response(result, backtest_id=None):
         win_rate=result.win_rate,
         total_trades=result.total_trades,
         avg_trade_duration_days=result.avg_trade_duration_days,
-        equity_curve=[EquityCurvePoint(**p) for p in result.equity_curve],
-        trade_log=result.trade_log,
+        equity_curve=equity_curve,
+        trade_log=result.trade_log if include_trades else [],
         backtest_id=backtest_id,
     )
 
 @router.post("", response_model=BacktestResponse)
-def run_backtest(body: BacktestRequest, db: Session = Depends(get_db)):
+async def run_backtest(body: BacktestRequest, db: Session = Depends(get_db)):
     if body.strategy not in STRATEGY_MAP:
         raise HTTPException(status_code=400, detail=f"Unknown strategy. Choose from: {list(STRATEGY_MAP.keys())}")
     strategy = STRATEGY_MAP[body.strategy]()
     engine = BacktestEngine(db)
     try:
-        result = engine.run(
+        result = await asyncio.to_thread(
+            engine.run,
             coingecko_id=body.coingecko_id.lower(),
             strategy=strategy,
             start_date=body.start_date,
@@ -60,32 +71,107 @@ def run_backtest(body: BacktestRequest, db: Session = Depends(get_db)):
             commission=body.commission,
             slippage=body.slippage,
         )
-        return result_to_response(result)
+        backtest_id = await asyncio.to_thread(engine.save, result) if body.save else None
+        return result_to_response(
+            result, backtest_id, max_points=body.max_points, include_trades=body.include_trades,
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Backtest failed: {e}")
 
+async def _prepare_compare(db: Session, coingecko_id: str, start_date: Optional[str], end_date: Optional[str]):
+    """Shared data for every strategy in a comparison (default window: 2022-01-01 to today)."""
+    start = date.fromisoformat(start_date) if start_date else date(2022, 1, 1)
+    end = date.fromisoformat(end_date) if end_date else date.today()
+    engine = BacktestEngine(db)
+    try:
+        return await asyncio.to_thread(engine.prepare, coingecko_id.lower(), start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+def _run_strategy(prepared, strategy_cls, initial_capital: float):
+    """
+    Strategies take a few milliseconds each on prepared data, so they run on a
+    thread: pickling inputs/results to a process pool would cost more than the work.
+    """
+    return asyncio.to_thread(BacktestEngine.run_with, prepared, strategy_cls(), initial_capital)
+
+
+def _sse(event: str, data) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+@router.get("/{backtest_id}/trades")
+async def stream_trades(backtest_id: int, db: Session = Depends(get_db)):
+    """Trade log of a saved run as NDJSON, one trade object per line."""
+    trade_log = await asyncio.to_thread(
+        db.scalar, select(BacktestRun.trade_log).where(BacktestRun.id == backtest_id),
+    )
+    if trade_log is None:
+        raise HTTPException(status_code=404, detail=f"Backtest {backtest_id} not found")
+    return StreamingResponse(
+        (orjson.dumps(trade) + b"\n" for trade in trade_log),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.post("/compare", response_model=list[BacktestResponse])
-def compare_strategies(
+async def compare_strategies(
     coingecko_id: str,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     initial_capital: float = 10_000.0,
+    max_points: Optional[int] = Query(None, ge=3),
     db: Session = Depends(get_db),
 ):
-    from datetime import date as date_type
-    start = date_type.fromisoformat(start_date) if start_date else date_type(2022, 1, 1)
-    end = date_type.fromisoformat(end_date) if end_date else date_type.today()
-    engine = BacktestEngine(db)
-    results = []
-    for strategy_cls in STRATEGY_MAP.values():
-        try:
-            result = engine.run(coingecko_id.lower(), strategy_cls(), start, end, initial_capital)
-            results.append(result_to_response(result))
-        except Exception:
-            continue
+    prepared = await _prepare_compare(db, coingecko_id, start_date, end_date)
+    outcomes = await asyncio.gather(*[
+        _run_strategy(prepared, strategy_cls, initial_capital)
+        for strategy_cls in STRATEGY_MAP.values()
+    ], return_exceptions=True)
+    results = [result_to_response(r, max_points=max_points) for r in outcomes if not isinstance(r, Exception)]
     if not results:
         raise HTTPException(status_code=500, detail="All strategies failed")
     results.sort(key=lambda r: r.sharpe_ratio, reverse=True)
     return results
+
+
+@router.get("/compare_stream")
+async def compare_strategies_stream(
+    coingecko_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    initial_capital: float = 10_000.0,
+    max_points: Optional[int] = Query(None, ge=3),
+    db: Session = Depends(get_db),
+):
+    """
+    Server-sent events version of /compare: a `start` event listing the strategies,
+    a `result` event per strategy as soon as it finishes, an `error` event for each
+    strategy that fails, then `done`.
+    """
+    prepared = await _prepare_compare(db, coingecko_id, start_date, end_date)
+
+    async def events():
+        yield _sse("start", {"strategies": list(STRATEGY_MAP)})
+        pending = {
+            asyncio.ensure_future(_run_strategy(prepared, strategy_cls, initial_capital)): name
+            for name, strategy_cls in STRATEGY_MAP.items()
+        }
+        while pending:
+            done, _ = await asyncio.wait(set(pending), return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                if future.exception() is not None:
+                    yield _sse("error", {"strategy": name, "detail": str(future.exception())})
+                else:
+                    yield _sse("result", result_to_response(future.result(), max_points=max_points).model_dump(mode="json"))
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -1,6 +1,9 @@
 """app/api/coins.py"""
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.core.cache import COINS_CACHE, invalidate_coin
 from app.db.session import get_db
 from app.db.models import Coin
 from app.services.ingestion import IngestionService
@@ -9,23 +12,34 @@ from app.models.schemas import CoinResponse
 router = APIRouter()
 
 @router.get("", response_model=list[CoinResponse])
-def list_coins(db: Session = Depends(get_db)):
-    return db.query(Coin).filter(Coin.is_active == True).all()
+async def list_coins(db: Session = Depends(get_db)):
+    coins = COINS_CACHE.get("active")
+    if coins is None:
+        stmt = select(
+            Coin.id, Coin.coingecko_id, Coin.symbol, Coin.name, Coin.market_cap_rank, Coin.is_active,
+        ).where(Coin.is_active.is_(True))
+        rows = await asyncio.to_thread(lambda: db.execute(stmt).mappings().all())
+        coins = [CoinResponse.model_validate(dict(row)) for row in rows]
+        COINS_CACHE.set("active", coins)
+    return coins
 
 @router.post("/{coingecko_id}", response_model=CoinResponse)
-def add_coin(coingecko_id: str, db: Session = Depends(get_db)):
+async def add_coin(coingecko_id: str, db: Session = Depends(get_db)):
     svc = IngestionService(db)
     try:
-        coin = svc.get_or_create_coin(coingecko_id.lower())
+        coin = await asyncio.to_thread(svc.get_or_create_coin, coingecko_id.lower())
+        COINS_CACHE.clear()
         return coin
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{coingecko_id}/seed")
-def seed_coin(coingecko_id: str, days: int = 365, db: Session = Depends(get_db)):
+async def seed_coin(coingecko_id: str, days: int = 365, db: Session = Depends(get_db)):
     svc = IngestionService(db)
     try:
-        rows = svc.fetch_price_history(coingecko_id.lower(), days=days)
+        rows = await asyncio.to_thread(svc.fetch_price_history, coingecko_id.lower(), days=days)
+        COINS_CACHE.clear()
+        invalidate_coin(coingecko_id.lower())
         return {"coin": coingecko_id, "rows_upserted": rows}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
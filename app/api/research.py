@@ -1,7 +1,9 @@
 """app/api/research.py"""
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional
+from app.core.cache import RESEARCH_CACHE
 from app.db.session import get_db
 from app.services.research import ResearchService
 from app.models.schemas import ResearchResponse
@@ -9,15 +11,21 @@ from app.models.schemas import ResearchResponse
 router = APIRouter()
 
 @router.get("/{coingecko_id}", response_model=ResearchResponse)
-def get_research(
+async def get_research(
     coingecko_id: str,
     question: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
 ):
+    key = (coingecko_id.lower(), question)
+    brief = RESEARCH_CACHE.get(key)
+    if brief is not None:
+        return brief
     svc = ResearchService(db)
     try:
-        return svc.generate_brief(coingecko_id.lower(), question=question)
+        brief = await asyncio.to_thread(svc.generate_brief, coingecko_id.lower(), question=question)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Research failed: {e}")
+    RESEARCH_CACHE.set(key, brief)
+    return brief
@@ -1,6 +1,8 @@
 """app/api/signals.py"""
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from app.core.cache import SIGNALS_CACHE, invalidate_coin
 from app.db.session import get_db
 from app.services.signals import SignalEngine
 from app.models.schemas import SignalResponse
@@ -8,20 +10,27 @@ from app.models.schemas import SignalResponse
 router = APIRouter()
 
 @router.get("/{coingecko_id}", response_model=SignalResponse)
-def get_signals(coingecko_id: str, db: Session = Depends(get_db)):
+async def get_signals(coingecko_id: str, db: Session = Depends(get_db)):
+    coingecko_id = coingecko_id.lower()
+    summary = SIGNALS_CACHE.get(coingecko_id)
+    if summary is not None:
+        return summary
     engine = SignalEngine(db)
     try:
-        return engine.get_signal_summary(coingecko_id.lower())
+        summary = await asyncio.to_thread(engine.get_signal_summary, coingecko_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error computing signals: {e}")
+    SIGNALS_CACHE.set(coingecko_id, summary)
+    return summary
 
 @router.post("/{coingecko_id}/compute")
-def compute_signals(coingecko_id: str, db: Session = Depends(get_db)):
+async def compute_signals(coingecko_id: str, db: Session = Depends(get_db)):
     engine = SignalEngine(db)
     try:
-        rows = engine.compute_and_store(coingecko_id.lower())
+        rows = await asyncio.to_thread(engine.compute_and_store, coingecko_id.lower())
+        invalidate_coin(coingecko_id.lower())
         return {"coin": coingecko_id, "rows_stored": rows}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
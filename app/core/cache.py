@@ -0,0 +1,67 @@
+"""
+app/core/cache.py
+
+Thread-safe in-process TTL cache. Sync route handlers run on a thread pool,
+and cachetools caches are not safe for concurrent use on their own.
+"""
+import threading
+from typing import Any, Callable, Hashable
+
+from cachetools import TTLCache
+
+
+class TTLStore:
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._cache.get(key, default)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [k for k in self._cache if predicate(k)]:
+                self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+# Route-level response caches, invalidated by the POST routes that change their data.
+# They live in process memory, so invalidation only reaches the worker that
+# handled the POST; other workers serve their entries until the TTL expires.
+COINS_CACHE = TTLStore(maxsize=1, ttl=3600)
+SIGNALS_CACHE = TTLStore(maxsize=256, ttl=300)
+RESEARCH_CACHE = TTLStore(maxsize=1024, ttl=600)  # keyed by (coingecko_id, question)
+
+# Prepared backtest inputs keyed by (coingecko_id, start, end); shared across strategies
+PREPARED_CACHE = TTLStore(maxsize=64, ttl=60)
+
+# Benchmarks used by prepared backtests (BTC, or ETH when backtesting BTC)
+_BENCHMARK_COINS = ("bitcoin", "ethereum")
+
+# Fear & Greed history is global (same for every coin) and updates once a day;
+# keyed by date.today(), value is (limit, DataFrame) for the widest fetch so far
+FEAR_GREED_CACHE = TTLStore(maxsize=1, ttl=3600)
+
+
+def invalidate_coin(coingecko_id: str) -> None:
+    """Drop cached signal summaries, research briefs and backtest inputs for a coin."""
+    SIGNALS_CACHE.pop(coingecko_id)
+    RESEARCH_CACHE.pop_where(lambda key: key[0] == coingecko_id)
+    if coingecko_id in _BENCHMARK_COINS:
+        # Every prepared window embeds benchmark returns from this coin
+        PREPARED_CACHE.clear()
+    else:
+        PREPARED_CACHE.pop_where(lambda key: key[0] == coingecko_id)
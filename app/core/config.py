@@ -1,30 +1,35 @@
 """
 app/core/config.py
 """
-from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
 
     database_url: str = "postgresql://localhost/cryptolens"
     anthropic_api_key: str = ""
     env: str = "development"
     log_level: str = "INFO"
+    cors_origins: tuple[str, ...] = ("http://localhost:8501",)  # Streamlit dev server
 
     # CoinGecko
     coingecko_api_url: str = "https://api.coingecko.com/api/v3"
     coingecko_api_key: str = ""  # optional — pro key for higher rate limits
+    coingecko_calls_per_minute: int = 30  # client-side budget for uncached requests
+    http_cache_path: str = "~/.cache/cryptolens/http.sqlite"  # requests-cache database for API responses
 
     # Fear & Greed
     fear_greed_url: str = "https://api.alternative.me/fng/"
 
     # Defaults
     default_lookback_days: int = 365
-    default_coins: list = ["bitcoin", "ethereum", "solana", "binancecoin"]
+    default_coins: tuple[str, ...] = ("bitcoin", "ethereum", "solana", "binancecoin")
+
+
+# Parsed once per process at import (reads .env once)
+SETTINGS = Settings()
 
 
-@lru_cache
 def get_settings() -> Settings:
-    return Settings()
+    return SETTINGS
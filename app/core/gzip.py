@@ -0,0 +1,35 @@
+"""
+app/core/gzip.py
+
+GZipMiddleware that leaves streamed responses (server-sent events, NDJSON)
+alone. Starlette's version (as pinned here) gzips streaming bodies into one
+buffer, so a stream would only reach the client when it ends.
+"""
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware as _GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+UNCOMPRESSED_CONTENT_TYPES = ("text/event-stream", "application/x-ndjson")
+
+
+class _Responder(GZipResponder):
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.startswith(UNCOMPRESSED_CONTENT_TYPES):
+                # Same pass-through path Starlette uses for already-encoded bodies
+                self.initial_message = message
+                self.content_encoding_set = True
+                return
+        await super().send_with_gzip(message)
+
+
+class GZipMiddleware(_GZipMiddleware):
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _Responder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -22,12 +22,16 @@ class Coin(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    prices = relationship("CoinPrice", back_populates="coin", cascade="all, delete-orphan")
-    signals = relationship("CoinSignal", back_populates="coin", cascade="all, delete-orphan")
+    # lazy="raise": history is loaded through explicit queries, never by touching these
+    prices = relationship("CoinPrice", back_populates="coin", cascade="all, delete-orphan", lazy="raise")
+    signals = relationship("CoinSignal", back_populates="coin", cascade="all, delete-orphan", lazy="raise")
 
 
 class CoinPrice(Base):
     __tablename__ = "cl_coin_prices"
+    # The unique constraint's btree on (coin_id, date) also serves the
+    # "WHERE coin_id = ? AND date BETWEEN ... ORDER BY date" range scans
+    # (read backwards for ORDER BY date DESC), so no separate index is needed.
     __table_args__ = (
         UniqueConstraint("coin_id", "date", name="uq_cl_price_coin_date"),
     )
@@ -47,11 +51,12 @@ class CoinPrice(Base):
     market_cap = Column(Float)
     total_volume_usd = Column(Float)
 
-    coin = relationship("Coin", back_populates="prices")
+    coin = relationship("Coin", back_populates="prices", lazy="raise")
 
 
 class CoinSignal(Base):
     __tablename__ = "cl_coin_signals"
+    # Backed by a (coin_id, date) btree; see CoinPrice.
     __table_args__ = (
         UniqueConstraint("coin_id", "date", name="uq_cl_signal_coin_date"),
     )
@@ -86,7 +91,7 @@ class CoinSignal(Base):
 
     computed_at = Column(DateTime, default=datetime.utcnow)
 
-    coin = relationship("Coin", back_populates="signals")
+    coin = relationship("Coin", back_populates="signals", lazy="raise")
 
 
 class BacktestRun(Base):
@@ -8,12 +8,21 @@ from app.db.models import Base
 
 settings = get_settings()
 
+
+def _engine_url(url: str) -> str:
+    """Use the psycopg 3 driver for plain postgresql:// URLs."""
+    if url.startswith("postgresql://"):
+        return "postgresql+psycopg://" + url[len("postgresql://"):]
+    return url
+
+
 engine = create_engine(
-    settings.database_url,
+    _engine_url(settings.database_url),
     pool_pre_ping=True,
     pool_size=5,
     max_overflow=10,
-    connect_args={"sslmode": "require"} if "supabase" in settings.database_url else {},
+    # Supabase's transaction pooler cannot hold server-side prepared statements
+    connect_args={"sslmode": "require", "prepare_threshold": None} if "supabase" in settings.database_url else {},
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,7 +1,7 @@
 """
 app/models/schemas.py
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import date
 
@@ -40,15 +40,24 @@ class BacktestRequest(BaseModel):
     commission: float = 0.001
     slippage: float = 0.001
     save: bool = False
+    # False: trade_log comes back empty; fetch it from GET /backtest/{id}/trades (needs save)
+    include_trades: bool = True
+    # Optional LTTB downsampling of equity_curve for charting; metrics always use every bar
+    max_points: Optional[int] = Field(None, ge=3)
 
 
-class EquityCurvePoint(BaseModel):
-    date: str
-    value: float
-    benchmark_value: float
+class EquityCurveSeries(BaseModel):
+    """Equity curve as parallel arrays (one entry per bar)."""
+    dates: List[str]
+    values: List[float]
+    benchmarks: List[float]
 
 
 class BacktestResponse(BaseModel):
+    """
+    Metrics are computed server-side on every bar; equity_curve may be downsampled
+    (max_points), so clients should use these fields rather than re-derive them.
+    """
     coin: str
     symbol: str
     strategy_name: str
@@ -68,7 +77,7 @@ class BacktestResponse(BaseModel):
     win_rate: float
     total_trades: int
     avg_trade_duration_days: float
-    equity_curve: List[EquityCurvePoint]
+    equity_curve: EquityCurveSeries
     trade_log: List[dict]
     backtest_id: Optional[int] = None
 
@@ -0,0 +1,43 @@
+"""
+app/services/_bt_loops.py
+
+Hot loops for the backtesting engine.
+"""
+import numpy as np
+import pandas as pd
+
+from app.services._njit import NUMBA_AVAILABLE, njit
+
+
+@njit(cache=True)
+def _threshold_state_loop(x, low, high):
+    """
+    Long/flat state machine: enter when x < low, exit when x > high.
+    Returns a uint8 position array (1 = in position, 0 = flat).
+    """
+    n = x.shape[0]
+    position = np.empty(n, np.uint8)
+    in_position = False
+    for i in range(n):
+        if not in_position and x[i] < low:
+            in_position = True
+        elif in_position and x[i] > high:
+            in_position = False
+        position[i] = 1 if in_position else 0
+    return position
+
+
+def _threshold_state_vectorized(x, low, high):
+    """
+    Same state machine without a loop: mark entry (1) / exit (0) events and
+    forward-fill the last one. Equivalent to the loop whenever low <= high.
+    """
+    events = np.where(x < low, 1.0, np.where(x > high, 0.0, np.nan))
+    return pd.Series(events).ffill().fillna(0).to_numpy(dtype=np.uint8)
+
+
+def threshold_positions(x: np.ndarray, low: float, high: float) -> np.ndarray:
+    """Long/flat positions for a threshold-crossing strategy."""
+    if NUMBA_AVAILABLE:
+        return _threshold_state_loop(x, low, high)
+    return _threshold_state_vectorized(x, low, high)
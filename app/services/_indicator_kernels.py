@@ -0,0 +1,133 @@
+"""
+app/services/_indicator_kernels.py
+
+Compiled kernels for the price-only technical indicators. Each follows the
+same definition as the pandas path in SignalEngine._compute_all_signals
+(the `ta` library's non-fillna semantics) for NaN-free close series.
+"""
+import numpy as np
+
+from app.services._njit import njit, prange
+
+INDICATOR_NAMES = [
+    "rsi_14", "macd", "macd_signal", "macd_hist",
+    "bb_upper", "bb_lower", "bb_pct",
+    "sma_20", "sma_50", "sma_200", "ema_12", "ema_26",
+]
+
+
+@njit(cache=True)
+def _ewm(x, alpha, min_periods):
+    """adjust=False EWM; leading NaNs are skipped, as pandas does."""
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    start = 0
+    while start < n and np.isnan(x[start]):
+        start += 1
+    if start == n:
+        return out
+    avg = x[start]
+    for i in range(start, n):
+        if i > start:
+            avg = (1.0 - alpha) * avg + alpha * x[i]
+        if i - start + 1 >= min_periods:
+            out[i] = avg
+    return out
+
+
+@njit(cache=True)
+def _ema(x, span):
+    return _ewm(x, 2.0 / (span + 1.0), span)
+
+
+@njit(cache=True)
+def _rsi(close, period):
+    """Wilder RSI; the first bar counts as a zero move."""
+    n = close.shape[0]
+    gain = np.zeros(n)
+    loss = np.zeros(n)
+    for i in range(1, n):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            gain[i] = d
+        elif d < 0:
+            loss[i] = -d
+    avg_gain = _ewm(gain, 1.0 / period, period)
+    avg_loss = _ewm(loss, 1.0 / period, period)
+    out = np.full(n, np.nan)
+    for i in range(period - 1, n):
+        if avg_loss[i] == 0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain[i] / avg_loss[i])
+    return out
+
+
+@njit(cache=True)
+def _rolling_mean_std(x, window):
+    """Rolling mean and population std (ddof=0); std is exactly 0 on flat windows."""
+    n = x.shape[0]
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        lo = i - window + 1
+        total = 0.0
+        flat = True
+        for j in range(lo, i + 1):
+            total += x[j]
+            if x[j] != x[lo]:
+                flat = False
+        m = total / window
+        mean[i] = m
+        if flat:
+            std[i] = 0.0
+        else:
+            ss = 0.0
+            for j in range(lo, i + 1):
+                ss += (x[j] - m) ** 2
+            std[i] = np.sqrt(ss / window)
+    return mean, std
+
+
+@njit(cache=True)
+def compute_indicators(close):
+    """(N,) float64 closes -> (N, len(INDICATOR_NAMES)) indicator matrix."""
+    n = close.shape[0]
+    out = np.empty((n, 12))
+
+    ema_12 = _ema(close, 12)
+    ema_26 = _ema(close, 26)
+    macd = ema_12 - ema_26
+    macd_signal = _ema(macd, 9)
+    sma_20, std_20 = _rolling_mean_std(close, 20)
+
+    out[:, 0] = _rsi(close, 14)
+    out[:, 1] = macd
+    out[:, 2] = macd_signal
+    out[:, 3] = macd - macd_signal
+    for i in range(n):
+        upper = sma_20[i] + 2 * std_20[i]
+        lower = sma_20[i] - 2 * std_20[i]
+        out[i, 4] = upper
+        out[i, 5] = lower
+        out[i, 6] = (close[i] - lower) / (upper - lower) if upper != lower else np.nan
+    out[:, 7] = sma_20
+    out[:, 8] = _rolling_mean_std(close, 50)[0]
+    out[:, 9] = _rolling_mean_std(close, 200)[0]
+    out[:, 10] = ema_12
+    out[:, 11] = ema_26
+    return out
+
+
+@njit(parallel=True, cache=True)
+def compute_indicators_batch(closes, lengths):
+    """
+    Batch mode for many coins at once. `closes` is (n_coins, max_len), each row
+    left-aligned and NaN-padded to `lengths[k]`; returns (n_coins, max_len, K).
+    """
+    n_coins, max_len = closes.shape
+    out = np.full((n_coins, max_len, 12), np.nan)
+    for k in prange(n_coins):
+        m = lengths[k]
+        out[k, :m, :] = compute_indicators(closes[k, :m])
+    return out
@@ -0,0 +1,21 @@
+"""
+app/services/_njit.py
+
+Optional numba JIT. Falls back to a no-op decorator when numba is not installed,
+so kernels still run (as plain Python) without the dependency.
+"""
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without numba
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+    prange = range
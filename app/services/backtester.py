@@ -13,6 +13,9 @@ import numpy as np
 import pandas as pd
 from sqlalchemy.orm import Session
 
+from app.core.cache import PREPARED_CACHE
+from app.db.models import BacktestRun
+from app.services._bt_loops import threshold_positions
 from app.services.ingestion import IngestionService
 from app.services.signals import SignalEngine
 
@@ -42,10 +45,20 @@ class BacktestResult:
     win_rate: float = 0.0
     total_trades: int = 0
     avg_trade_duration_days: float = 0.0
-    equity_curve: list = field(default_factory=list)
+    equity_curve: dict = field(default_factory=dict)  # {"dates", "values", "benchmarks"}
     trade_log: list = field(default_factory=list)
 
 
+@dataclass
+class PreparedData:
+    """Strategy-independent inputs for a backtest window."""
+    coin: str
+    symbol: str
+    prices: pd.DataFrame
+    signals: pd.DataFrame
+    benchmark_returns: pd.Series
+
+
 # ------------------------------------------------------------------
 # Strategy definitions
 # ------------------------------------------------------------------
@@ -68,15 +81,9 @@ class RSIMeanReversionStrategy:
 
     def generate_signals(self, prices: pd.DataFrame, signals: pd.DataFrame) -> pd.Series:
         rsi = signals["rsi_14"].reindex(prices.index).fillna(50)
-        position = pd.Series(0, index=prices.index)
-        in_position = False
-        for i in range(len(rsi)):
-            if not in_position and rsi.iloc[i] < self.params["oversold"]:
-                in_position = True
-            elif in_position and rsi.iloc[i] > self.params["overbought"]:
-                in_position = False
-            position.iloc[i] = 1 if in_position else 0
-        return position
+        arr = rsi.to_numpy(dtype=np.float64, copy=False)
+        pos = threshold_positions(arr, self.params["oversold"], self.params["overbought"])
+        return pd.Series(pos, index=prices.index)
 
 
 class GoldenCrossStrategy:
@@ -96,15 +103,9 @@ class FearGreedStrategy:
 
     def generate_signals(self, prices: pd.DataFrame, signals: pd.DataFrame) -> pd.Series:
         fg = signals["fear_greed_index"].reindex(prices.index).fillna(50)
-        position = pd.Series(0, index=prices.index)
-        in_position = False
-        for i in range(len(fg)):
-            if not in_position and fg.iloc[i] < self.params["extreme_fear_buy"]:
-                in_position = True
-            elif in_position and fg.iloc[i] > self.params["extreme_greed_sell"]:
-                in_position = False
-            position.iloc[i] = 1 if in_position else 0
-        return position
+        arr = fg.to_numpy(dtype=np.float64, copy=False)
+        pos = threshold_positions(arr, self.params["extreme_fear_buy"], self.params["extreme_greed_sell"])
+        return pd.Series(pos, index=prices.index)
 
 
 # ------------------------------------------------------------------
@@ -116,7 +117,15 @@ class BacktestEngine:
     def __init__(self, db: Session):
         self.db = db
         self.ingestion = IngestionService(db)
-        self.signal_engine = SignalEngine(db)
+        self.signal_engine = SignalEngine(db, self.ingestion)
+        self._px_cache: dict[tuple, pd.DataFrame] = {}
+
+    def _prices(self, coingecko_id: str, start: Optional[date], end: Optional[date]) -> pd.DataFrame:
+        """Price history, cached for the lifetime of the engine (one request)."""
+        key = (coingecko_id.lower(), start, end)
+        if key not in self._px_cache:
+            self._px_cache[key] = self.ingestion.get_price_dataframe(coingecko_id, start, end)
+        return self._px_cache[key]
 
     def run(
         self,
@@ -128,12 +137,28 @@ class BacktestEngine:
         commission: float = 0.001,
         slippage: float = 0.001,
     ) -> BacktestResult:
+        prepared = self.prepare(coingecko_id, start_date, end_date)
+        return self.run_with(prepared, strategy, initial_capital, commission, slippage)
 
-        from app.db.models import Coin
-        coin = self.db.query(Coin).filter(Coin.coingecko_id == coingecko_id.lower()).first()
+    def prepare(
+        self,
+        coingecko_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> PreparedData:
+        """
+        Load prices, signals and benchmark returns for a backtest window.
+        Strategy-independent, so it is shared across strategies and cached briefly.
+        """
+        key = (coingecko_id.lower(), start_date, end_date)
+        prepared = PREPARED_CACHE.get(key)
+        if prepared is not None:
+            return prepared
+
+        coin = self.ingestion.get_coin(coingecko_id)
         symbol = coin.symbol if coin else coingecko_id.upper()
 
-        prices = self.ingestion.get_price_dataframe(coingecko_id, start_date, end_date)
+        prices = self._prices(coingecko_id, start_date, end_date)
         signals_df = self.signal_engine._compute_all_signals(
             prices, self.ingestion.fetch_fear_greed(limit=len(prices) + 10)
         )
@@ -142,92 +167,154 @@ class BacktestEngine:
         prices = prices.loc[common_idx]
         signals_df = signals_df.loc[common_idx]
 
-        if start_date:
-            prices = prices[prices.index.date >= start_date]
-            signals_df = signals_df[signals_df.index >= pd.Timestamp(start_date)]
-        if end_date:
-            prices = prices[prices.index.date <= end_date]
-            signals_df = signals_df[signals_df.index <= pd.Timestamp(end_date)]
+        # Sorted DatetimeIndex: label slicing is a binary search, not a per-row date compare
+        start_ts = pd.Timestamp(start_date) if start_date else None
+        end_ts = pd.Timestamp(end_date) if end_date else None
+        prices = prices.loc[start_ts:end_ts]
+        signals_df = signals_df.loc[start_ts:end_ts]
 
         if len(prices) < 30:
             raise ValueError(f"Not enough data: {len(prices)} rows")
 
-        raw_signals = strategy.generate_signals(prices, signals_df)
-        portfolio = self._simulate_portfolio(prices, raw_signals, initial_capital, commission, slippage)
         benchmark_returns = self._get_benchmark_returns(coingecko_id, prices.index[0].date(), prices.index[-1].date())
 
-        return self._compute_metrics(
+        prepared = PreparedData(
             coin=coingecko_id,
             symbol=symbol,
+            prices=prices,
+            signals=signals_df,
+            benchmark_returns=benchmark_returns,
+        )
+        PREPARED_CACHE.set(key, prepared)
+        return prepared
+
+    @staticmethod
+    def run_with(
+        prepared: PreparedData,
+        strategy,
+        initial_capital: float = 10_000.0,
+        commission: float = 0.001,
+        slippage: float = 0.001,
+    ) -> BacktestResult:
+        """Run a strategy on data from prepare(). No DB or network access."""
+        prices = prepared.prices
+        raw_signals = strategy.generate_signals(prices, prepared.signals)
+        portfolio = BacktestEngine._simulate_portfolio(prices, raw_signals, initial_capital, commission, slippage)
+
+        return BacktestEngine._compute_metrics(
+            coin=prepared.coin,
+            symbol=prepared.symbol,
             strategy=strategy,
             portfolio=portfolio,
-            benchmark_returns=benchmark_returns,
+            benchmark_returns=prepared.benchmark_returns,
             initial_capital=initial_capital,
             start_date=prices.index[0].date(),
             end_date=prices.index[-1].date(),
         )
 
-    def _simulate_portfolio(self, prices, signals, initial_capital, commission, slippage):
-        close = prices["close"]
-        signals = signals.reindex(close.index).fillna(0)
-        position_changes = signals.diff().fillna(signals)
+    def save(self, result: BacktestResult) -> int:
+        """Persist a finished run (metrics, equity curve, trade log); returns its id."""
+        run = BacktestRun(
+            coin_id=result.coin,
+            coin_symbol=result.symbol,
+            strategy_name=result.strategy_name,
+            strategy_params=result.strategy_params,
+            start_date=result.start_date,
+            end_date=result.end_date,
+            total_return=result.total_return,
+            annualized_return=result.annualized_return,
+            benchmark_return=result.benchmark_return,
+            sharpe_ratio=result.sharpe_ratio,
+            sortino_ratio=result.sortino_ratio,
+            max_drawdown=result.max_drawdown,
+            win_rate=result.win_rate,
+            total_trades=result.total_trades,
+            avg_trade_duration_days=result.avg_trade_duration_days,
+            equity_curve=result.equity_curve,
+            trade_log=result.trade_log,
+        )
+        self.db.add(run)
+        self.db.commit()
+        return run.id
+
+    @staticmethod
+    def _simulate_portfolio(prices, signals, initial_capital, commission, slippage):
+        index = prices.index
+        close = prices["close"].to_numpy(dtype=np.float64)
+        position = signals.reindex(index).fillna(0).to_numpy(dtype=np.float64)
+
+        position_changes = np.diff(position, prepend=0.0)
         entries = position_changes > 0
         exits = position_changes < 0
-        asset_returns = close.pct_change().fillna(0)
-        cost = (commission + slippage) * (entries | exits).astype(float)
-        strategy_returns = signals.shift(1).fillna(0) * asset_returns - cost
-        portfolio_value = initial_capital * (1 + strategy_returns).cumprod()
+        # Returns run over forward-filled closes so a missing bar is a zero move
+        filled = prices["close"].ffill().to_numpy(dtype=np.float64)
+        asset_returns = np.zeros_like(close)
+        asset_returns[1:] = filled[1:] / filled[:-1] - 1
+        asset_returns[np.isnan(asset_returns)] = 0.0
+        cost = (commission + slippage) * (entries | exits)
+        held = np.concatenate(([0.0], position[:-1]))
+        strategy_returns = held * asset_returns - cost
+        portfolio_value = initial_capital * np.cumprod(1 + strategy_returns)
 
         return pd.DataFrame({
             "close": close,
-            "position": signals,
+            "position": position,
             "asset_return": asset_returns,
             "strategy_return": strategy_returns,
             "portfolio_value": portfolio_value,
             "is_entry": entries,
             "is_exit": exits,
-        })
-
-    def _build_trade_log(self, portfolio):
-        trades = []
-        entry_date = entry_price = None
-        for idx, row in portfolio.iterrows():
-            if row["is_entry"] and entry_date is None:
-                entry_date, entry_price = idx, row["close"]
-            elif row["is_exit"] and entry_date is not None:
-                trade_return = (row["close"] - entry_price) / entry_price
-                trades.append({
-                    "entry_date": str(entry_date.date()),
-                    "exit_date": str(idx.date()),
-                    "entry_price": round(float(entry_price), 6),
-                    "exit_price": round(float(row["close"]), 6),
-                    "return": round(float(trade_return), 6),
-                    "duration_days": (idx - entry_date).days,
-                    "profitable": trade_return > 0,
-                })
-                entry_date = entry_price = None
+        }, index=index)
+
+    @staticmethod
+    def _build_trade_log(portfolio):
+        entries_idx = np.flatnonzero(portfolio["is_entry"].to_numpy())
+        exits_idx = np.flatnonzero(portfolio["is_exit"].to_numpy())
+
+        # Pair each exit with the latest entry before it; keep the first exit per entry
+        entry_pos = np.searchsorted(entries_idx, exits_idx, side="right") - 1
+        valid = entry_pos >= 0
+        entry_pos, exits_idx = entry_pos[valid], exits_idx[valid]
+        entry_pos, first = np.unique(entry_pos, return_index=True)
+        exits_idx = exits_idx[first]
+        entries_idx_paired = entries_idx[entry_pos]
 
         # Close any still-open position at end of data
-        if entry_date is not None:
-            last_idx = portfolio.index[-1]
-            last_price = float(portfolio["close"].iloc[-1])
-            trade_return = (last_price - entry_price) / entry_price
-            trades.append({
-                "entry_date": str(entry_date.date()),
-                "exit_date": str(last_idx.date()),
-                "entry_price": round(float(entry_price), 6),
-                "exit_price": round(float(last_price), 6),
-                "return": round(float(trade_return), 6),
-                "duration_days": (last_idx - entry_date).days,
-                "profitable": trade_return > 0,
-            })
-        return trades
+        if entries_idx.size and (not exits_idx.size or entries_idx[-1] > exits_idx[-1]):
+            entries_idx_paired = np.append(entries_idx_paired, entries_idx[-1])
+            exits_idx = np.append(exits_idx, len(portfolio) - 1)
+
+        close = portfolio["close"].to_numpy(dtype=np.float64)
+        entry_prices = close[entries_idx_paired]
+        exit_prices = close[exits_idx]
+        trade_returns = (exit_prices - entry_prices) / entry_prices
+        entry_dates = portfolio.index[entries_idx_paired]
+        exit_dates = portfolio.index[exits_idx]
+        durations = (exit_dates - entry_dates).days
+
+        return [{
+            "entry_date": entry_date,
+            "exit_date": exit_date,
+            "entry_price": entry_price,
+            "exit_price": exit_price,
+            "return": trade_return,
+            "duration_days": duration,
+            "profitable": profitable,
+        } for entry_date, exit_date, entry_price, exit_price, trade_return, duration, profitable in zip(
+            entry_dates.strftime("%Y-%m-%d").tolist(),
+            exit_dates.strftime("%Y-%m-%d").tolist(),
+            np.round(entry_prices, 6).tolist(),
+            np.round(exit_prices, 6).tolist(),
+            np.round(trade_returns, 6).tolist(),
+            durations.tolist(),
+            (trade_returns > 0).tolist(),
+        )]
 
     def _get_benchmark_returns(self, coingecko_id, start, end):
         """BTC buy-and-hold as benchmark (or same coin if already BTC)."""
         try:
             bench_id = "bitcoin" if coingecko_id != "bitcoin" else "ethereum"
-            bench_prices = self.ingestion.get_price_dataframe(bench_id, start, end)
+            bench_prices = self._prices(bench_id, start, end)
             returns = bench_prices["close"].pct_change().fillna(0)
             returns.index = pd.to_datetime(returns.index)
             return returns
@@ -235,10 +322,11 @@ class BacktestEngine:
             logger.warning(f"Could not get benchmark: {e}")
             return pd.Series(dtype=float)
 
-    def _compute_metrics(self, coin, symbol, strategy, portfolio, benchmark_returns, initial_capital, start_date, end_date):
+    @staticmethod
+    def _compute_metrics(coin, symbol, strategy, portfolio, benchmark_returns, initial_capital, start_date, end_date):
         pv = portfolio["portfolio_value"]
         daily_returns = portfolio["strategy_return"]
-        trades = self._build_trade_log(portfolio)
+        trades = BacktestEngine._build_trade_log(portfolio)
 
         total_return = float((pv.iloc[-1] / initial_capital) - 1)
         n_years = len(pv) / TRADING_DAYS_PER_YEAR
@@ -261,11 +349,11 @@ class BacktestEngine:
         benchmark_total = float((1 + aligned_bench).prod() - 1)
 
         bench_cumulative = initial_capital * (1 + aligned_bench).cumprod()
-        equity_curve = [{
-            "date": str(idx.date()),
-            "value": round(float(v), 2),
-            "benchmark_value": round(float(bench_cumulative.get(idx, initial_capital)), 2),
-        } for idx, v in pv.items()]
+        dates = pv.index.strftime("%Y-%m-%d").tolist()
+        values = np.round(pv.to_numpy(dtype=np.float64), 2).tolist()
+        # aligned_bench is already on pv.index with no gaps, so this lines up bar-for-bar
+        bench = np.round(bench_cumulative.to_numpy(dtype=np.float64), 2).tolist()
+        equity_curve = {"dates": dates, "values": values, "benchmarks": bench}
 
         win_rate = float(sum(1 for t in trades if t["profitable"]) / len(trades)) if trades else 0.0
         avg_duration = float(np.mean([t["duration_days"] for t in trades])) if trades else 0.0
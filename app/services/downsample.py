@@ -0,0 +1,65 @@
+"""
+app/services/downsample.py
+
+Largest-Triangle-Three-Buckets (LTTB) downsampling for chart payloads.
+Keeps the first and last points and, per bucket, the point that spans the
+largest triangle with its neighbours — so peaks and troughs survive.
+"""
+import numpy as np
+
+from app.services._njit import njit
+
+
+@njit(cache=True)
+def lttb_indices(x, y, n_out):
+    """Indices of the `n_out` points LTTB keeps from (x, y); all of them if n_out >= len."""
+    n = x.shape[0]
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    keep = np.empty(n_out, np.int64)
+    keep[0] = 0
+    keep[n_out - 1] = n - 1
+    bucket = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        lo = int(i * bucket) + 1
+        hi = int((i + 1) * bucket) + 1
+        # Average of the next bucket is the third triangle vertex
+        nlo = hi
+        nhi = min(int((i + 2) * bucket) + 1, n)
+        avg_x = 0.0
+        avg_y = 0.0
+        for j in range(nlo, nhi):
+            avg_x += x[j]
+            avg_y += y[j]
+        if nhi > nlo:
+            avg_x /= nhi - nlo
+            avg_y /= nhi - nlo
+        else:
+            avg_x = x[n - 1]
+            avg_y = y[n - 1]
+
+        best = lo
+        best_area = -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best_area = area
+                best = j
+        keep[i + 1] = best
+        a = best
+    return keep
+
+
+def downsample_equity_curve(equity_curve: dict, max_points: int) -> dict:
+    """
+    LTTB-reduce an equity curve ({"dates", "values", "benchmarks"}) to at most
+    `max_points` bars. Points are picked on the strategy values; the benchmark
+    keeps the same bars so both series stay aligned.
+    """
+    values = np.asarray(equity_curve["values"], dtype=np.float64)
+    if len(values) <= max_points:
+        return equity_curve
+    idx = lttb_indices(np.arange(len(values), dtype=np.float64), values, max_points)
+    return {key: [series[i] for i in idx] for key, series in equity_curve.items()}
@@ -5,17 +5,25 @@ Fetches crypto price data from CoinGecko API (free tier, no key needed).
 Also fetches Fear & Greed index from alternative.me.
 """
 import logging
+import threading
+from functools import cache
 import time
-from datetime import date, datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from typing import Optional
 
-import requests
 import pandas as pd
-import numpy as np
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import insert
 
 from app.db.models import Coin, CoinPrice
+from app.core.cache import FEAR_GREED_CACHE
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -23,27 +31,180 @@ settings = get_settings()
 
 COINGECKO_BASE = settings.coingecko_api_url
 FEAR_GREED_URL = settings.fear_greed_url
+HTTP_POOL_HOSTS = 4    # CoinGecko + alternative.me, with headroom
+HTTP_POOL_SIZE = 16    # keep-alive connections per host
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Sliding-window limiter: at most `calls` acquisitions per `period` seconds,
+    shared by every thread in the process. Callers block until a slot frees up.
+
+    It also adapts to what the server reports (see observe): a 429 or an
+    exhausted X-RateLimit-Remaining pauses every caller for Retry-After seconds,
+    or an exponential back-off when the header is missing.
+    """
+
+    def __init__(self, calls: int, period: float):
+        self.calls = calls
+        self.period = period
+        self._stamps: deque[float] = deque()
+        self._paused_until = 0.0
+        self._strikes = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    while self._stamps and now - self._stamps[0] >= self.period:
+                        self._stamps.popleft()
+                    if len(self._stamps) < self.calls:
+                        self._stamps.append(now)
+                        return
+                    wait = self.period - (now - self._stamps[0])
+            time.sleep(wait)
+
+    def observe(self, response) -> None:
+        """Feed a response back; throttling signals pause all callers."""
+        retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+        exhausted = response.headers.get("X-RateLimit-Remaining", "").strip() == "0"
+        with self._lock:
+            if response.status_code == 429:
+                self._strikes += 1
+                delay = retry_after if retry_after is not None else min(2.0 ** self._strikes, self.period)
+            elif exhausted:
+                delay = retry_after if retry_after is not None else self.period
+            else:
+                self._strikes = 0
+                return
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        logger.warning(f"Rate limited by {response.url}; pausing requests for {delay:.1f}s")
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that takes a limiter slot before every request it actually sends
+    and reports each response back. 429s are retried here rather than by urllib3,
+    so the back-off holds every thread, not only the one that was throttled.
+    """
+
+    def __init__(self, limiter: RateLimiter, max_429_retries: int = 3, **kwargs):
+        self.limiter = limiter
+        self.max_429_retries = max_429_retries
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        for attempt in range(self.max_429_retries + 1):
+            self.limiter.acquire()
+            resp = super().send(request, **kwargs)
+            self.limiter.observe(resp)
+            if resp.status_code != 429 or attempt == self.max_429_retries:
+                return resp
+            resp.close()
+
+
+# One CoinGecko budget per process, however many IngestionService instances exist
+COINGECKO_LIMITER = RateLimiter(settings.coingecko_calls_per_minute, 60.0)
+
+@cache
+def _http_session() -> requests_cache.CachedSession:
+    """
+    Cached, retrying session: repeated lookups within the TTL never leave the
+    process, and 5xx (plus 429 outside CoinGecko) responses are retried with
+    exponential backoff. Price history is never cached, so a refresh always sees
+    today's candle; only slow-moving metadata, listings and Fear & Greed are.
+
+    Built on first use and shared by every IngestionService (i.e. every request)
+    in the process, so importing this module never opens the cache database.
+    """
+    session = requests_cache.CachedSession(
+        settings.http_cache_path,
+        backend="sqlite",
+        expire_after=3600,
+        urls_expire_after={
+            f"{COINGECKO_BASE}/coins/*/ohlc": requests_cache.DO_NOT_CACHE,
+            f"{COINGECKO_BASE}/coins/*/market_chart": requests_cache.DO_NOT_CACHE,
+            f"{COINGECKO_BASE}/coins/markets": 300,
+            FEAR_GREED_URL: 3600,
+        },
+        allowable_methods=("GET",),
+    )
+    # Keep-alive pool sized for concurrent fetches, so parallel requests to the
+    # same host reuse warm TLS connections instead of opening throwaway ones
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(
+        max_retries=retry, pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE,
+    ))
+    # CoinGecko requests are throttled to the shared budget; cache hits are
+    # answered by CachedSession before reaching the adapter, so they are free.
+    # 429s are left to the adapter so the limiter sees them.
+    session.mount(COINGECKO_BASE, RateLimitedAdapter(
+        COINGECKO_LIMITER,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+        pool_connections=1, pool_maxsize=HTTP_POOL_SIZE,
+    ))
+    session.headers.update({
+        "Accept": "application/json",
+        "User-Agent": "CryptoLens/1.0",
+    })
+    if settings.coingecko_api_key:
+        session.headers["x-cg-pro-api-key"] = settings.coingecko_api_key
+    return session
+
+
+# Fallback when the Fear & Greed fetch fails; same columns/dtypes as a real result
+_EMPTY_FG = pd.DataFrame({
+    "date": pd.Series(dtype=object),
+    "value": pd.Series(dtype="float64"),
+    "label": pd.Series(dtype=object),
+})
 
 
 class IngestionService:
 
     def __init__(self, db: Session):
         self.db = db
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Accept": "application/json",
-            "User-Agent": "CryptoLens/1.0",
-        })
-        if settings.coingecko_api_key:
-            self.session.headers["x-cg-pro-api-key"] = settings.coingecko_api_key
+        self._coin_cache: dict[str, Coin] = {}
+
+    @property
+    def session(self) -> requests_cache.CachedSession:
+        return _http_session()
 
     # ------------------------------------------------------------------
     # Coin management
     # ------------------------------------------------------------------
 
+    def get_coin(self, coingecko_id: str) -> Optional[Coin]:
+        """Coin lookup, cached for the lifetime of the service (one request)."""
+        cid = coingecko_id.lower()
+        coin = self._coin_cache.get(cid)
+        if coin is None:
+            coin = self.db.query(Coin).filter(Coin.coingecko_id == cid).first()
+            if coin:
+                self._coin_cache[cid] = coin
+        return coin
+
     def get_or_create_coin(self, coingecko_id: str) -> Coin:
         """Get or create a coin record."""
-        coin = self.db.query(Coin).filter(Coin.coingecko_id == coingecko_id.lower()).first()
+        coin = self.get_coin(coingecko_id)
         if coin:
             return coin
 
@@ -73,6 +234,7 @@ class IngestionService:
         self.db.add(coin)
         self.db.commit()
         self.db.refresh(coin)
+        self._coin_cache[coin.coingecko_id] = coin
         logger.info(f"Created coin: {coin.symbol} ({coingecko_id})")
         return coin
 
@@ -94,95 +256,67 @@ class IngestionService:
 
         logger.info(f"Fetching {days}d price history for {coingecko_id}")
 
-        try:
-            # CoinGecko OHLC endpoint (returns [timestamp, open, high, low, close])
-            resp = self.session.get(
+        # CoinGecko OHLC endpoint (returns [timestamp, open, high, low, close]) and
+        # market chart (volume + market cap) are independent — fetch them concurrently
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            ohlc_future = pool.submit(
+                self.session.get,
                 f"{COINGECKO_BASE}/coins/{coingecko_id}/ohlc",
                 params={"vs_currency": vs_currency, "days": days},
                 timeout=30,
             )
+            chart_future = pool.submit(
+                self.session.get,
+                f"{COINGECKO_BASE}/coins/{coingecko_id}/market_chart",
+                params={"vs_currency": vs_currency, "days": days, "interval": "daily"},
+                timeout=30,
+            )
+
+        try:
+            resp = ohlc_future.result()
             resp.raise_for_status()
             ohlc_data = resp.json()
         except Exception as e:
             logger.error(f"Failed to fetch OHLC for {coingecko_id}: {e}")
             raise
 
-        # Also fetch market chart for volume + market cap
         try:
-            resp2 = self.session.get(
-                f"{COINGECKO_BASE}/coins/{coingecko_id}/market_chart",
-                params={"vs_currency": vs_currency, "days": days, "interval": "daily"},
-                timeout=30,
-            )
+            resp2 = chart_future.result()
             resp2.raise_for_status()
             chart_data = resp2.json()
         except Exception as e:
             logger.warning(f"Could not fetch market chart for {coingecko_id}: {e}")
             chart_data = {}
 
-        # Build DataFrames
-        ohlc_df = pd.DataFrame(ohlc_data, columns=["timestamp", "open", "high", "low", "close"])
-        ohlc_df["date"] = pd.to_datetime(ohlc_df["timestamp"], unit="ms").dt.date
+        # Build DataFrames — each source is bucketed into UTC days with one resample
+        def daily(rows: list, columns: list):
+            frame = pd.DataFrame(rows, columns=["timestamp", *columns])
+            frame.index = pd.to_datetime(frame.pop("timestamp"), unit="ms").rename("date")
+            return frame.resample("1D")
 
-        # Volume
-        vol_df = pd.DataFrame(
-            chart_data.get("total_volumes", []), columns=["timestamp", "volume"]
-        )
-        if not vol_df.empty:
-            vol_df["date"] = pd.to_datetime(vol_df["timestamp"], unit="ms").dt.date
-            vol_df = vol_df.groupby("date")["volume"].last().reset_index()
-
-        # Market cap
-        mcap_df = pd.DataFrame(
-            chart_data.get("market_caps", []), columns=["timestamp", "market_cap"]
-        )
-        if not mcap_df.empty:
-            mcap_df["date"] = pd.to_datetime(mcap_df["timestamp"], unit="ms").dt.date
-            mcap_df = mcap_df.groupby("date")["market_cap"].last().reset_index()
+        ohlc = daily(ohlc_data, ["open", "high", "low", "close"]).agg(
+            {"open": "first", "high": "max", "low": "min", "close": "last"}
+        ).dropna(how="all")  # resample fills gap days; keep only days with candles
+        volume = daily(chart_data.get("total_volumes", []), ["volume"]).last()
+        market_cap = daily(chart_data.get("market_caps", []), ["market_cap"]).last()
 
         # Merge
-        df = ohlc_df.groupby("date").agg(
-            open=("open", "first"),
-            high=("high", "max"),
-            low=("low", "min"),
-            close=("close", "last"),
-        ).reset_index()
-
-        if not vol_df.empty:
-            df = df.merge(vol_df, on="date", how="left")
-        else:
-            df["volume"] = None
-
-        if not mcap_df.empty:
-            df = df.merge(mcap_df, on="date", how="left")
-        else:
-            df["market_cap"] = None
-
-        # Upsert
-        rows_upserted = 0
-        for _, row in df.iterrows():
-            stmt = insert(CoinPrice).values(
-                coin_id=coin.id,
-                date=row["date"],
-                open=float(row["open"]) if pd.notna(row.get("open")) else None,
-                high=float(row["high"]) if pd.notna(row.get("high")) else None,
-                low=float(row["low"]) if pd.notna(row.get("low")) else None,
-                close=float(row["close"]),
-                volume=float(row["volume"]) if pd.notna(row.get("volume")) else None,
-                market_cap=float(row["market_cap"]) if pd.notna(row.get("market_cap")) else None,
-            ).on_conflict_do_update(
+        df = ohlc.join([volume, market_cap], how="left").reset_index()
+        df["date"] = df["date"].dt.date
+
+        # Upsert — one compiled INSERT ... ON CONFLICT executed over all rows
+        df["coin_id"] = coin.id
+        df = df[["coin_id", "date", "open", "high", "low", "close", "volume", "market_cap"]]
+        df = df.astype(object).where(df.notna(), None)
+        records = df.to_dict("records")
+        rows_upserted = len(records)
+        if records:
+            stmt = insert(CoinPrice)
+            stmt = stmt.on_conflict_do_update(
                 constraint="uq_cl_price_coin_date",
-                set_={
-                    "open": float(row["open"]) if pd.notna(row.get("open")) else None,
-                    "high": float(row["high"]) if pd.notna(row.get("high")) else None,
-                    "low": float(row["low"]) if pd.notna(row.get("low")) else None,
-                    "close": float(row["close"]),
-                    "volume": float(row["volume"]) if pd.notna(row.get("volume")) else None,
-                    "market_cap": float(row["market_cap"]) if pd.notna(row.get("market_cap")) else None,
-                }
+                set_={c: stmt.excluded[c] for c in ("open", "high", "low", "close", "volume", "market_cap")},
             )
-            self.db.execute(stmt)
-            rows_upserted += 1
+            self.db.execute(stmt, records)
 
         self.db.commit()
         logger.info(f"Upserted {rows_upserted} rows for {coingecko_id}")
@@ -195,32 +329,27 @@ class IngestionService:
         end_date: Optional[date] = None,
     ) -> pd.DataFrame:
         """Load price data from DB as DataFrame."""
-        coin = self.db.query(Coin).filter(Coin.coingecko_id == coingecko_id.lower()).first()
+        coin = self.get_coin(coingecko_id)
         if not coin:
             raise ValueError(f"Coin {coingecko_id} not found. Seed it first.")
 
-        query = self.db.query(CoinPrice).filter(CoinPrice.coin_id == coin.id)
+        stmt = (
+            select(
+                CoinPrice.date, CoinPrice.open, CoinPrice.high, CoinPrice.low,
+                CoinPrice.close, CoinPrice.volume, CoinPrice.market_cap,
+            )
+            .where(CoinPrice.coin_id == coin.id)
+            .order_by(CoinPrice.date.asc())
+        )
         if start_date:
-            query = query.filter(CoinPrice.date >= start_date)
+            stmt = stmt.where(CoinPrice.date >= start_date)
         if end_date:
-            query = query.filter(CoinPrice.date <= end_date)
+            stmt = stmt.where(CoinPrice.date <= end_date)
 
-        rows = query.order_by(CoinPrice.date.asc()).all()
-        if not rows:
+        # Columnar read straight from the cursor, skipping ORM hydration
+        df = pd.read_sql(stmt, self.db.connection(), index_col="date", parse_dates=["date"])
+        if df.empty:
             raise ValueError(f"No price data for {coingecko_id}. Run fetch_price_history() first.")
-
-        df = pd.DataFrame([{
-            "date": r.date,
-            "open": r.open,
-            "high": r.high,
-            "low": r.low,
-            "close": r.close,
-            "volume": r.volume,
-            "market_cap": r.market_cap,
-        } for r in rows])
-
-        df["date"] = pd.to_datetime(df["date"])
-        df = df.set_index("date").sort_index()
         return df
 
     # ------------------------------------------------------------------
@@ -231,7 +360,14 @@ class IngestionService:
         """
         Fetch Fear & Greed index history from alternative.me.
         Returns DataFrame with date, value (0-100), label columns.
+
+        The index is the same for every coin, so the widest history fetched
+        today is cached in-process and narrower requests are served from it.
         """
+        cached = FEAR_GREED_CACHE.get(date.today())
+        if cached is not None and cached[0] >= limit:
+            return cached[1].tail(limit).copy()
+
         try:
             resp = self.session.get(
                 FEAR_GREED_URL,
@@ -244,10 +380,13 @@ class IngestionService:
             df["date"] = pd.to_datetime(df["timestamp"].astype(int), unit="s").dt.date
             df["value"] = df["value"].astype(float)
             df = df.rename(columns={"value_classification": "label"})
-            return df[["date", "value", "label"]].sort_values("date")
+            df = df[["date", "value", "label"]].sort_values("date")
+            if not df.empty:
+                FEAR_GREED_CACHE.set(date.today(), (limit, df))
+            return df.copy()
         except Exception as e:
             logger.warning(f"Could not fetch Fear & Greed: {e}")
-            return pd.DataFrame(columns=["date", "value", "label"])
+            return _EMPTY_FG.copy()
 
     # ------------------------------------------------------------------
     # Top coins list
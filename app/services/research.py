@@ -7,7 +7,6 @@ import logging
 from datetime import datetime
 from typing import Optional
 
-import anthropic
 from sqlalchemy.orm import Session
 
 from app.services.signals import SignalEngine
@@ -17,19 +16,57 @@ from app.core.config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+SYSTEM_PROMPT = """You are a senior crypto analyst writing a concise research brief.
+
+Write a structured research brief with these sections:
+1. **Signal Summary** (2-3 sentences on what the data says)
+2. **Bull Case** (2-3 bullet points)
+3. **Bear Case** (2-3 bullet points)
+4. **Key Levels to Watch** (support/resistance based on Bollinger Bands and moving averages)
+5. **Bottom Line** (1-2 sentence conclusion)
+
+Be direct, data-driven, and specific. Avoid generic crypto hype. Note that past signals do not guarantee future performance."""
+
+BRIEF_TEMPLATE = """## {coin_name} ({symbol}) — Signal Data as of {as_of}
+
+**Price:** ${price:,.4f}
+**30-Day Change:** {change_30d:+.1f}%
+**7-Day Change:** {change_7d:+.1f}%
+**Drawdown from ATH (in dataset):** {drawdown:.1f}%
+
+**Technical Signals:**
+- RSI-14: {rsi} → {rsi_note}
+- MACD Histogram: {macd_hist} → {macd_note}
+- Bollinger %B: {bb_pct} → {bb_note}
+
+**Crypto-Specific:**
+- Fear & Greed Index: {fear_greed} ({fear_greed_label})
+- 24h Volume Change: {volume_change}
+
+**Composite Signal Score:** {score:+.3f} → **{signal}**
+(Scale: -1.0 = strong sell, 0 = neutral, +1.0 = strong buy)
+{question}"""
+
+
+def _fmt(value: Optional[float], spec: str) -> str:
+    """Format an optional indicator value, "N/A" when missing."""
+    return "N/A" if value is None else format(value, spec)
+
 
 class ResearchService:
 
     def __init__(self, db: Session):
         self.db = db
-        self.signal_engine = SignalEngine(db)
         self.ingestion = IngestionService(db)
+        self.signal_engine = SignalEngine(db, self.ingestion)
+        # Imported here so API workers and scripts that never call Claude skip the SDK import
+        import anthropic
         self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
 
     def generate_brief(self, coingecko_id: str, question: Optional[str] = None) -> dict:
         """Generate a Claude-powered research brief for a coin."""
-        summary = self.signal_engine.get_signal_summary(coingecko_id)
         prices = self.ingestion.get_price_dataframe(coingecko_id)
+        summary = self.signal_engine.get_signal_summary(coingecko_id, prices=prices)
 
         # Build price context
         current_price = float(prices["close"].iloc[-1])
@@ -42,41 +79,35 @@ class ResearchService:
         coin_name = coingecko_id.replace("-", " ").title()
         symbol = summary.get("symbol", coingecko_id.upper())
 
-        prompt = f"""You are a senior crypto analyst writing a concise research brief.
-
-## {coin_name} ({symbol}) — Signal Data as of {datetime.now().strftime('%Y-%m-%d')}
-
-**Price:** ${current_price:,.4f}
-**30-Day Change:** {price_change_30d:+.1f}%
-**7-Day Change:** {summary.get('price_change_7d_pct', 0):+.1f}%
-**Drawdown from ATH (in dataset):** {drawdown_from_ath:.1f}%
-
-**Technical Signals:**
-- RSI-14: {indicators.get('rsi_14', 'N/A'):.1f} → {indicators.get('rsi_interpretation', 'N/A')}
-- MACD Histogram: {indicators.get('macd_hist', 0):.4f} → {indicators.get('macd_interpretation', 'N/A')}
-- Bollinger %B: {indicators.get('bb_pct', 0.5):.2f} → {indicators.get('bb_interpretation', 'N/A')}
-
-**Crypto-Specific:**
-- Fear & Greed Index: {indicators.get('fear_greed_index', 'N/A')} ({indicators.get('fear_greed_label', 'N/A')})
-- 24h Volume Change: {f"{indicators.get('volume_change_24h', 0):.1f}%" if indicators.get('volume_change_24h') else 'N/A'}
-
-**Composite Signal Score:** {summary.get('composite_score', 0):+.3f} → **{summary.get('signal', 'NEUTRAL')}**
-(Scale: -1.0 = strong sell, 0 = neutral, +1.0 = strong buy)
-
-{"**Analyst Question:** " + question if question else ""}
-
-Write a structured research brief with these sections:
-1. **Signal Summary** (2-3 sentences on what the data says)
-2. **Bull Case** (2-3 bullet points)
-3. **Bear Case** (2-3 bullet points)
-4. **Key Levels to Watch** (support/resistance based on Bollinger Bands and moving averages)
-5. **Bottom Line** (1-2 sentence conclusion)
-
-Be direct, data-driven, and specific. Avoid generic crypto hype. Note that past signals do not guarantee future performance."""
+        volume_change = indicators.get("volume_change_24h")
+        prompt = BRIEF_TEMPLATE.format(
+            coin_name=coin_name,
+            symbol=symbol,
+            as_of=datetime.now().strftime("%Y-%m-%d"),
+            price=current_price,
+            change_30d=price_change_30d,
+            change_7d=summary.get("price_change_7d_pct", 0),
+            drawdown=drawdown_from_ath,
+            rsi=_fmt(indicators.get("rsi_14"), ".1f"),
+            rsi_note=indicators.get("rsi_interpretation", "N/A"),
+            macd_hist=_fmt(indicators.get("macd_hist"), ".4f"),
+            macd_note=indicators.get("macd_interpretation", "N/A"),
+            bb_pct=_fmt(indicators.get("bb_pct"), ".2f"),
+            bb_note=indicators.get("bb_interpretation", "N/A"),
+            fear_greed=_fmt(indicators.get("fear_greed_index"), ""),
+            fear_greed_label=indicators.get("fear_greed_label") or "N/A",
+            volume_change=f"{volume_change:.1f}%" if volume_change else "N/A",
+            score=summary.get("composite_score", 0),
+            signal=summary.get("signal", "NEUTRAL"),
+            question=f"\n**Analyst Question:** {question}\n" if question else "",
+        )
 
+        # Static instructions go in the system prompt; only the data varies per call.
+        # They are far below the minimum cacheable prompt length, so no cache_control.
         response = self.client.messages.create(
             model="claude-opus-4-6",
             max_tokens=1024,
+            system=SYSTEM_PROMPT,
             messages=[{"role": "user", "content": prompt}],
         )
 
@@ -9,27 +9,45 @@ from typing import Optional
 
 import pandas as pd
 import numpy as np
-import ta
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import insert
 
-from app.db.models import Coin, CoinSignal
+from app.db.models import Coin, CoinPrice, CoinSignal
+from app.services._indicator_kernels import INDICATOR_NAMES, compute_indicators
+from app.services._njit import NUMBA_AVAILABLE
 from app.services.ingestion import IngestionService
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Signal columns persisted to cl_coin_signals
+SIGNAL_COLUMNS = [
+    "rsi_14", "macd", "macd_signal", "macd_hist",
+    "bb_upper", "bb_lower", "bb_pct",
+    "sma_20", "sma_50", "sma_200", "ema_12", "ema_26", "obv",
+    "fear_greed_index", "fear_greed_label",
+    "volume_change_24h", "market_cap_change_24h",
+    "composite_score",
+]
+NUMERIC_SIGNAL_COLUMNS = [c for c in SIGNAL_COLUMNS if c != "fear_greed_label"]
+# Columns refreshed when a (coin, date) row already exists
+SIGNAL_UPDATE_COLUMNS = [
+    "rsi_14", "macd_hist", "bb_pct", "fear_greed_index", "fear_greed_label",
+    "composite_score", "computed_at",
+]
+
 
 class SignalEngine:
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, ingestion: Optional[IngestionService] = None):
         self.db = db
-        self.ingestion = IngestionService(db)
+        self.ingestion = ingestion or IngestionService(db)
 
     def compute_and_store(self, coingecko_id: str) -> int:
         """Compute all signals and store in DB. Returns rows written."""
-        coin = self.db.query(Coin).filter(Coin.coingecko_id == coingecko_id.lower()).first()
+        coin = self.ingestion.get_coin(coingecko_id)
         if not coin:
             raise ValueError(f"Coin {coingecko_id} not found")
 
@@ -38,55 +56,28 @@ class SignalEngine:
 
         signals_df = self._compute_all_signals(prices, fear_greed)
 
-        rows_written = 0
-        for idx, row in signals_df.iterrows():
-            row_date = idx.date() if hasattr(idx, 'date') else idx
-
-            def safe(val):
-                if val is None:
-                    return None
-                try:
-                    v = float(val)
-                    return None if np.isnan(v) or np.isinf(v) else v
-                except:
-                    return None
-
-            stmt = insert(CoinSignal).values(
-                coin_id=coin.id,
-                date=row_date,
-                rsi_14=safe(row.get("rsi_14")),
-                macd=safe(row.get("macd")),
-                macd_signal=safe(row.get("macd_signal")),
-                macd_hist=safe(row.get("macd_hist")),
-                bb_upper=safe(row.get("bb_upper")),
-                bb_lower=safe(row.get("bb_lower")),
-                bb_pct=safe(row.get("bb_pct")),
-                sma_20=safe(row.get("sma_20")),
-                sma_50=safe(row.get("sma_50")),
-                sma_200=safe(row.get("sma_200")),
-                ema_12=safe(row.get("ema_12")),
-                ema_26=safe(row.get("ema_26")),
-                obv=safe(row.get("obv")),
-                fear_greed_index=safe(row.get("fear_greed_index")),
-                fear_greed_label=str(row.get("fear_greed_label", "")) or None,
-                volume_change_24h=safe(row.get("volume_change_24h")),
-                market_cap_change_24h=safe(row.get("market_cap_change_24h")),
-                composite_score=safe(row.get("composite_score")),
-                computed_at=datetime.utcnow(),
-            ).on_conflict_do_update(
+        # Sanitize once for the whole frame: numeric columns are coerced to float
+        # with inf/NaN -> None (SQL NULL); the label is the only string column.
+        numeric = signals_df.reindex(columns=NUMERIC_SIGNAL_COLUMNS).apply(pd.to_numeric, errors="coerce").astype(np.float64)
+        numeric = numeric.replace([np.inf, -np.inf], np.nan)
+        df = numeric.astype(object).where(numeric.notna(), None)
+        labels = signals_df.get("fear_greed_label", pd.Series(index=signals_df.index, dtype=object))
+        df["fear_greed_label"] = labels.fillna("").astype(str).replace("", None)
+        df = df[SIGNAL_COLUMNS]
+        df.insert(0, "date", signals_df.index.date)
+        df.insert(0, "coin_id", coin.id)
+        df["computed_at"] = datetime.utcnow()
+        records = df.to_dict("records")
+
+        # One compiled upsert executed over all rows; psycopg 3 pipelines the batch
+        if records:
+            stmt = insert(CoinSignal)
+            stmt = stmt.on_conflict_do_update(
                 constraint="uq_cl_signal_coin_date",
-                set_={
-                    "rsi_14": safe(row.get("rsi_14")),
-                    "macd_hist": safe(row.get("macd_hist")),
-                    "bb_pct": safe(row.get("bb_pct")),
-                    "fear_greed_index": safe(row.get("fear_greed_index")),
-                    "fear_greed_label": str(row.get("fear_greed_label", "")) or None,
-                    "composite_score": safe(row.get("composite_score")),
-                    "computed_at": datetime.utcnow(),
-                }
+                set_={c: stmt.excluded[c] for c in SIGNAL_UPDATE_COLUMNS},
             )
-            self.db.execute(stmt)
-            rows_written += 1
+            self.db.execute(stmt, records)
+        rows_written = len(records)
 
         self.db.commit()
         logger.info(f"Stored {rows_written} signal rows for {coingecko_id}")
@@ -102,35 +93,56 @@ class SignalEngine:
         volume = prices.get("volume", pd.Series(dtype=float))
         market_cap = prices.get("market_cap", pd.Series(dtype=float))
 
-        signals = pd.DataFrame(index=prices.index)
-
-        # --- RSI ---
-        signals["rsi_14"] = ta.momentum.RSIIndicator(close=close, window=14).rsi()
-
-        # --- MACD ---
-        macd = ta.trend.MACD(close=close, window_slow=26, window_fast=12, window_sign=9)
-        signals["macd"] = macd.macd()
-        signals["macd_signal"] = macd.macd_signal()
-        signals["macd_hist"] = macd.macd_diff()
-
-        # --- Bollinger Bands ---
-        bb = ta.volatility.BollingerBands(close=close, window=20, window_dev=2)
-        signals["bb_upper"] = bb.bollinger_hband()
-        signals["bb_lower"] = bb.bollinger_lband()
-        signals["bb_pct"] = bb.bollinger_pband()
-
-        # --- Moving Averages ---
-        signals["sma_20"] = ta.trend.SMAIndicator(close=close, window=20).sma_indicator()
-        signals["sma_50"] = ta.trend.SMAIndicator(close=close, window=50).sma_indicator()
-        signals["sma_200"] = ta.trend.SMAIndicator(close=close, window=200).sma_indicator()
-        signals["ema_12"] = ta.trend.EMAIndicator(close=close, window=12).ema_indicator()
-        signals["ema_26"] = ta.trend.EMAIndicator(close=close, window=26).ema_indicator()
+        close_arr = close.to_numpy(dtype=np.float64)
+        if NUMBA_AVAILABLE and not np.isnan(close_arr).any():
+            # One compiled pass over the close series for all price-only indicators
+            signals = pd.DataFrame(
+                compute_indicators(close_arr), index=prices.index, columns=INDICATOR_NAMES
+            )
+        else:
+            signals = pd.DataFrame(index=prices.index)
+
+            # Indicators below follow the `ta` library's definitions (non-fillna mode),
+            # computed inline so the EMA-12/26 passes are shared with MACD.
+
+            # --- RSI (Wilder smoothing) ---
+            delta = close.diff()
+            gain = delta.where(delta > 0, 0.0)   # first bar counts as a zero move
+            loss = -delta.where(delta < 0, 0.0)
+            avg_gain = gain.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+            avg_loss = loss.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+            rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+            signals["rsi_14"] = rsi.mask(avg_loss == 0, 100.0)
+
+            # --- MACD ---
+            ema_12 = close.ewm(span=12, min_periods=12, adjust=False).mean()
+            ema_26 = close.ewm(span=26, min_periods=26, adjust=False).mean()
+            macd_line = ema_12 - ema_26
+            macd_signal = macd_line.ewm(span=9, min_periods=9, adjust=False).mean()
+            signals["macd"] = macd_line
+            signals["macd_signal"] = macd_signal
+            signals["macd_hist"] = macd_line - macd_signal
+
+            # --- Bollinger Bands ---
+            sma_20 = close.rolling(20).mean()
+            std_20 = close.rolling(20).std(ddof=0)
+            bb_upper = sma_20 + 2 * std_20
+            bb_lower = sma_20 - 2 * std_20
+            signals["bb_upper"] = bb_upper
+            signals["bb_lower"] = bb_lower
+            signals["bb_pct"] = (close - bb_lower) / (bb_upper - bb_lower).where(bb_upper != bb_lower)
+
+            # --- Moving Averages ---
+            signals["sma_20"] = sma_20
+            signals["sma_50"] = close.rolling(50).mean()
+            signals["sma_200"] = close.rolling(200).mean()
+            signals["ema_12"] = ema_12
+            signals["ema_26"] = ema_26
 
         # --- OBV ---
         if volume is not None and not volume.isna().all():
-            signals["obv"] = ta.volume.OnBalanceVolumeIndicator(
-                close=close, volume=volume.fillna(0)
-            ).on_balance_volume()
+            vol = volume.fillna(0)
+            signals["obv"] = vol.mask(close < close.shift(), -vol).cumsum()
 
         # --- Volume change ---
         if volume is not None and not volume.isna().all():
@@ -155,16 +167,16 @@ class SignalEngine:
 
     def _compute_composite(self, df: pd.DataFrame) -> pd.Series:
         """Weighted composite score from all signals."""
-        score = pd.Series(0.0, index=df.index)
+        score = np.zeros(len(df))
         weights = 0.0
 
+        # Piecewise scores below go through np.select; NaN inputs fall through
+        # to the linear branch and stay NaN, as with the old per-element lambdas.
+
         # RSI (weight: 0.25)
         if "rsi_14" in df:
-            rsi_score = df["rsi_14"].apply(lambda x:
-                -1.0 if x > 70 else
-                +1.0 if x < 30 else
-                (50 - x) / 50 * 0.5
-            )
+            rsi = df["rsi_14"].to_numpy(dtype=np.float64)
+            rsi_score = np.select([rsi > 70, rsi < 30], [-1.0, 1.0], (50 - rsi) / 50 * 0.5)
             score += rsi_score * 0.25
             weights += 0.25
 
@@ -172,16 +184,13 @@ class SignalEngine:
         if "macd_hist" in df:
             macd_norm = df["macd_hist"].fillna(0)
             max_val = macd_norm.abs().rolling(50, min_periods=1).max().replace(0, 1)
-            score += (macd_norm / max_val).clip(-1, 1) * 0.25
+            score += (macd_norm / max_val).clip(-1, 1).to_numpy(dtype=np.float64) * 0.25
             weights += 0.25
 
         # Bollinger %B (weight: 0.20)
         if "bb_pct" in df:
-            bb_score = df["bb_pct"].apply(lambda x:
-                -1.0 if x > 0.9 else
-                +1.0 if x < 0.1 else
-                (0.5 - x)
-            )
+            bb = df["bb_pct"].to_numpy(dtype=np.float64)
+            bb_score = np.select([bb > 0.9, bb < 0.1], [-1.0, 1.0], 0.5 - bb)
             score += bb_score * 0.20
             weights += 0.20
 
@@ -193,19 +202,22 @@ class SignalEngine:
 
         # Fear & Greed (weight: 0.15) — contrarian
         if "fear_greed_index" in df:
-            fg_score = df["fear_greed_index"].apply(lambda x:
-                +1.0 if x < 20 else   # extreme fear = buy
-                -1.0 if x > 80 else   # extreme greed = sell
-                (50 - x) / 50 * 0.5
+            fg = df["fear_greed_index"].to_numpy(dtype=np.float64)
+            fg_score = np.select(
+                [fg < 20, fg > 80],   # extreme fear = buy, extreme greed = sell
+                [1.0, -1.0],
+                (50 - fg) / 50 * 0.5,
             )
             score += fg_score * 0.15
             weights += 0.15
 
-        return (score / weights if weights > 0 else score).clip(-1, 1)
+        if weights > 0:
+            score = score / weights
+        return pd.Series(score, index=df.index).clip(-1, 1)
 
     def get_latest_signals(self, coingecko_id: str, n: int = 1) -> pd.DataFrame:
         """Get most recent N signal rows from DB."""
-        coin = self.db.query(Coin).filter(Coin.coingecko_id == coingecko_id.lower()).first()
+        coin = self.ingestion.get_coin(coingecko_id)
         if not coin:
             raise ValueError(f"Coin {coingecko_id} not found")
 
@@ -235,22 +247,55 @@ class SignalEngine:
             "composite_score": r.composite_score,
         } for r in rows])
 
-    def get_signal_summary(self, coingecko_id: str) -> dict:
-        """Get human-readable signal summary for a coin."""
-        df = self.get_latest_signals(coingecko_id, n=1)
-        if df.empty:
+    def _latest_signal_row(self, coingecko_id: str) -> Optional[CoinSignal]:
+        """Most recent signal row as an ORM object — no DataFrame for the single-row case."""
+        coin = self.ingestion.get_coin(coingecko_id)
+        if not coin:
+            raise ValueError(f"Coin {coingecko_id} not found")
+
+        return (
+            self.db.query(CoinSignal)
+            .filter(CoinSignal.coin_id == coin.id)
+            .order_by(CoinSignal.date.desc())
+            .first()
+        )
+
+    def _fetch_recent_closes(self, coingecko_id: str, n: int = 7) -> list:
+        """Most recent N closing prices, newest first."""
+        stmt = (
+            select(CoinPrice.close)
+            .join(Coin, Coin.id == CoinPrice.coin_id)
+            .where(Coin.coingecko_id == coingecko_id.lower())
+            .order_by(CoinPrice.date.desc())
+            .limit(n)
+        )
+        return list(self.db.execute(stmt).scalars())
+
+    def get_signal_summary(self, coingecko_id: str, prices: Optional[pd.DataFrame] = None) -> dict:
+        """
+        Get human-readable signal summary for a coin.
+        Pass `prices` when the caller has already loaded the price history.
+        """
+        row = self._latest_signal_row(coingecko_id)
+        if row is None:
             raise ValueError(f"No signals for {coingecko_id}. Run compute_and_store() first.")
 
-        row = df.iloc[0]
-        prices = self.ingestion.get_price_dataframe(coingecko_id)
-        current_price = float(prices["close"].iloc[-1])
-        price_change_7d = float(
-            (prices["close"].iloc[-1] / prices["close"].iloc[-7] - 1) * 100
-        ) if len(prices) >= 7 else 0.0
+        if prices is not None:
+            closes = prices["close"].iloc[:-8:-1].tolist()
+        else:
+            closes = self._fetch_recent_closes(coingecko_id, n=7)
+        if not closes:
+            raise ValueError(f"No price data for {coingecko_id}. Run fetch_price_history() first.")
+
+        # closes are newest first
+        current_price = float(closes[0])
+        price_change_7d = float((closes[0] / closes[-1] - 1) * 100) if len(closes) >= 7 else 0.0
 
-        rsi = row["rsi_14"]
-        score = row["composite_score"]
-        fg = row["fear_greed_index"]
+        rsi = row.rsi_14
+        score = row.composite_score if row.composite_score is not None else 0.0
+        fg = row.fear_greed_index
+        macd_hist = row.macd_hist
+        bb_pct = row.bb_pct
 
         overall = (
             "STRONG BUY" if score > 0.5 else
@@ -265,7 +310,7 @@ class SignalEngine:
             "price_usd": current_price,
             "price_change_7d_pct": price_change_7d,
             "signal": overall,
-            "composite_score": float(score) if score is not None else 0.0,
+            "composite_score": float(score),
             "indicators": {
                 "rsi_14": float(rsi) if rsi else None,
                 "rsi_interpretation": (
@@ -273,18 +318,18 @@ class SignalEngine:
                     "overbought (bearish)" if rsi and rsi > 70 else
                     "neutral"
                 ),
-                "macd_hist": float(row["macd_hist"]) if row["macd_hist"] else None,
+                "macd_hist": float(macd_hist) if macd_hist else None,
                 "macd_interpretation": (
-                    "bullish" if row["macd_hist"] and row["macd_hist"] > 0 else "bearish"
+                    "bullish" if macd_hist and macd_hist > 0 else "bearish"
                 ),
-                "bb_pct": float(row["bb_pct"]) if row["bb_pct"] else None,
+                "bb_pct": float(bb_pct) if bb_pct else None,
                 "bb_interpretation": (
-                    "near lower band (potential bounce)" if row["bb_pct"] and row["bb_pct"] < 0.2 else
-                    "near upper band (potential reversal)" if row["bb_pct"] and row["bb_pct"] > 0.8 else
+                    "near lower band (potential bounce)" if bb_pct and bb_pct < 0.2 else
+                    "near upper band (potential reversal)" if bb_pct and bb_pct > 0.8 else
                     "mid-range"
                 ),
                 "fear_greed_index": float(fg) if fg else None,
-                "fear_greed_label": row["fear_greed_label"],
-                "volume_change_24h": float(row["volume_change_24h"]) if row["volume_change_24h"] else None,
+                "fear_greed_label": row.fear_greed_label,
+                "volume_change_24h": float(row.volume_change_24h) if row.volume_change_24h else None,
             }
         }
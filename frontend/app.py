@@ -2,8 +2,39 @@
 frontend/app.py — CryptoLens Dashboard
 Run: python -m streamlit run frontend/app.py
 """
+import importlib
+import threading
+
 import streamlit as st
 
+VIEWS = {
+    "🔍 Research": "frontend.views.research",
+    "📊 Backtest": "frontend.views.backtest",
+    "⚖️ Compare Strategies": "frontend.views.compare",
+}
+
+
+# Streamlit re-executes this script on every rerun, so a module-level lru_cache
+# would start empty each time; cache_resource persists for the server process.
+@st.cache_resource(show_spinner=False)
+def _view(module: str):
+    """Import a view on first visit and reuse its render() on later reruns."""
+    return importlib.import_module(module).render
+
+
+@st.cache_resource(show_spinner=False)
+def _prewarm() -> None:
+    """
+    Import the views' heavy dependencies once per server process on a background
+    thread, so the first visit to any page doesn't pay for them on the UI thread.
+    """
+    def _load():
+        for module in ("pandas", "plotly.graph_objects", "plotly.express"):
+            importlib.import_module(module)
+
+    threading.Thread(target=_load, name="cryptolens-prewarm", daemon=True).start()
+
+
 st.set_page_config(
     page_title="CryptoLens",
     page_icon="🔮",
@@ -18,19 +49,13 @@ st.sidebar.divider()
 
 page = st.sidebar.radio(
     "Navigate",
-    ["🔍 Research", "📊 Backtest", "⚖️ Compare Strategies"],
+    list(VIEWS),
     label_visibility="collapsed",
 )
 
 st.sidebar.divider()
 st.sidebar.caption("Powered by Claude · Built by Cameron Cooper")
 
-if page == "🔍 Research":
-    from frontend.views.research import render
-    render()
-elif page == "📊 Backtest":
-    from frontend.views.backtest import render
-    render()
-elif page == "⚖️ Compare Strategies":
-    from frontend.views.compare import render
-    render()
+_prewarm()
+render = _view(VIEWS[page])
+render()
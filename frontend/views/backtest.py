@@ -1,10 +1,15 @@
 """frontend/views/backtest.py"""
 import streamlit as st
 import requests
+import orjson
+import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import plotly.graph_objects as go
 import plotly.express as px
 
 API_BASE = "http://localhost:8000"
+CHART_POINTS = 400  # equity curves are LTTB-downsampled server-side to this many bars
 
 POPULAR_COINS = {
     "Bitcoin (BTC)": "bitcoin",
@@ -14,6 +19,7 @@ POPULAR_COINS = {
     "XRP": "ripple",
     "Dogecoin (DOGE)": "dogecoin",
 }
+_COIN_LABELS = list(POPULAR_COINS)  # selectbox options, built once per process
 
 STRATEGIES = {
     "Composite Score": "composite",
@@ -21,6 +27,35 @@ STRATEGIES = {
     "Golden Cross (SMA50/200)": "golden_cross",
     "Fear & Greed Contrarian": "fear_greed",
 }
+_STRATEGY_LABELS = list(STRATEGIES)
+
+STRATEGY_NOTES = {
+    "composite": "Weighted aggregate of RSI + MACD + Bollinger + Fear&Greed. Most sophisticated.",
+    "rsi": "Buy when RSI < 30 (oversold), sell when RSI > 70 (overbought).",
+    "golden_cross": "Buy when SMA50 crosses above SMA200. Trend-following.",
+    "fear_greed": "Buy on extreme fear (< 25), sell on extreme greed (> 75). Contrarian.",
+}
+
+
+# Keep-alive session reused across reruns; retries cover API restarts (connection refused)
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=4, max_retries=Retry(total=2, backoff_factor=0.1),
+))
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _run_backtest(payload: dict) -> dict:
+    """POST /backtest; identical configs within the TTL are served from cache."""
+    resp = _SESSION.post(f"{API_BASE}/backtest", json=payload, timeout=60)
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
+
+
+@st.cache_data(show_spinner=False)
+def _fetch_trades(backtest_id: int) -> pd.DataFrame:
+    """GET /backtest/{id}/trades (NDJSON), parsed as it arrives; saved runs never change, so no TTL."""
+    return pd.read_json(f"{API_BASE}/backtest/{backtest_id}/trades", lines=True)
 
 
 def render():
@@ -29,25 +64,21 @@ def render():
 
     with st.sidebar:
         st.subheader("Backtest Config")
-        selected_label = st.selectbox("Coin", list(POPULAR_COINS.keys()))
+        selected_label = st.selectbox("Coin", _COIN_LABELS)
         coin_id = POPULAR_COINS[selected_label]
         custom_coin = st.text_input("Or CoinGecko ID", placeholder="polkadot")
         if custom_coin:
             coin_id = custom_coin.lower().strip()
 
-        strategy_label = st.selectbox("Strategy", list(STRATEGIES.keys()))
+        strategy_label = st.selectbox("Strategy", _STRATEGY_LABELS)
         strategy = STRATEGIES[strategy_label]
 
-        st.caption({
-            "composite": "Weighted aggregate of RSI + MACD + Bollinger + Fear&Greed. Most sophisticated.",
-            "rsi": "Buy when RSI < 30 (oversold), sell when RSI > 70 (overbought).",
-            "golden_cross": "Buy when SMA50 crosses above SMA200. Trend-following.",
-            "fear_greed": "Buy on extreme fear (< 25), sell on extreme greed (> 75). Contrarian.",
-        }.get(strategy, ""))
+        st.caption(STRATEGY_NOTES.get(strategy, ""))
 
         start_date = st.date_input("Start", value=None)
         end_date = st.date_input("End", value=None)
         capital = st.number_input("Initial Capital ($)", value=10000, step=1000)
+        save = st.checkbox("Save run", value=False, help="Store this run in the database (cl_backtest_runs)")
         run = st.button("🚀 Run Backtest", type="primary")
 
     if run:
@@ -57,15 +88,17 @@ def render():
                     "coingecko_id": coin_id,
                     "strategy": strategy,
                     "initial_capital": capital,
+                    "max_points": CHART_POINTS,
+                    "save": save,
+                    # Saved runs stream their trades separately as NDJSON
+                    "include_trades": not save,
                 }
                 if start_date:
                     payload["start_date"] = str(start_date)
                 if end_date:
                     payload["end_date"] = str(end_date)
 
-                resp = requests.post(f"{API_BASE}/backtest", json=payload, timeout=60)
-                resp.raise_for_status()
-                data = resp.json()
+                data = _run_backtest(payload)
             except Exception as e:
                 st.error(f"API error: {e}")
                 return
@@ -85,20 +118,22 @@ def render():
         # Equity curve
         st.subheader("📈 Equity Curve vs Benchmark")
         equity = data["equity_curve"]
-        if equity:
-            dates = [e["date"] for e in equity]
-            values = [e["value"] for e in equity]
-            bench = [e["benchmark_value"] for e in equity]
-
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(x=dates, y=values, name=f"{strategy_label}", line=dict(color="#6c63ff", width=2)))
-            fig.add_trace(go.Scatter(x=dates, y=bench, name="BTC Buy & Hold", line=dict(color="#ff9800", width=2, dash="dash")))
-            fig.add_hline(y=capital, line_dash="dot", line_color="gray", opacity=0.5)
-            fig.update_layout(
-                height=400,
-                hovermode="x unified",
-                legend=dict(orientation="h", yanchor="bottom", y=1.02),
-                margin=dict(t=30, b=0),
+        if equity["dates"]:
+            fig = go.Figure(
+                data=[
+                    go.Scatter(x=equity["dates"], y=equity["values"], name=f"{strategy_label}", line=dict(color="#6c63ff", width=2)),
+                    go.Scatter(x=equity["dates"], y=equity["benchmarks"], name="BTC Buy & Hold", line=dict(color="#ff9800", width=2, dash="dash")),
+                ],
+                layout=go.Layout(
+                    height=400,
+                    hovermode="x unified",
+                    legend=dict(orientation="h", yanchor="bottom", y=1.02),
+                    margin=dict(t=30, b=0),
+                    shapes=[dict(
+                        type="line", xref="paper", x0=0, x1=1, y0=capital, y1=capital,
+                        line=dict(color="gray", dash="dot"), opacity=0.5,
+                    )],
+                ),
             )
             st.plotly_chart(fig, use_container_width=True)
 
@@ -114,15 +149,26 @@ def render():
             st.metric("Volatility (Ann.)", f"{data['volatility_annualized']:.1%}")
             st.metric("Avg Trade Duration", f"{data['avg_trade_duration_days']:.0f} days")
 
+        if data.get("backtest_id"):
+            st.caption(f"Saved as backtest #{data['backtest_id']}")
+
         # Trade log
-        trades = data.get("trade_log", [])
-        if trades:
-            st.subheader(f"📋 Trade Log ({len(trades)} trades)")
-            import pandas as pd
-            df = pd.DataFrame(trades)
-            df["return"] = df["return"].apply(lambda x: f"{x:+.2%}")
-            df["profitable"] = df["profitable"].apply(lambda x: "✅" if x else "❌")
-            st.dataframe(df, use_container_width=True, hide_index=True)
+        if data["total_trades"]:
+            if data.get("backtest_id"):
+                df = _fetch_trades(data["backtest_id"])
+            else:
+                df = pd.DataFrame(data["trade_log"])
+            st.subheader(f"📋 Trade Log ({len(df)} trades)")
+            df["return"] *= 100  # fraction -> percent; formatting is left to the column config
+            st.dataframe(
+                df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "return": st.column_config.NumberColumn("return", format="%+.2f%%"),
+                    "profitable": st.column_config.CheckboxColumn("profitable"),
+                },
+            )
     else:
         st.divider()
         st.markdown("### Configure a backtest in the sidebar to get started.")
@@ -1,10 +1,17 @@
 """frontend/views/compare.py"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import orjson
 import streamlit as st
-import requests
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import plotly.graph_objects as go
 import pandas as pd
 
 API_BASE = "http://localhost:8000"
+CHART_POINTS = 400  # equity curves are LTTB-downsampled server-side to this many bars
 
 POPULAR_COINS = {
     "Bitcoin (BTC)": "bitcoin",
@@ -14,6 +21,163 @@ POPULAR_COINS = {
     "XRP": "ripple",
     "Dogecoin (DOGE)": "dogecoin",
 }
+_COIN_LABELS = list(POPULAR_COINS)  # selectbox options, built once per process
+
+DEFAULT_START = "2022-01-01"  # same default window as /backtest/compare
+MEDALS = ["🥇", "🥈", "🥉", "4️⃣"]
+
+# Compare runs happen off the script thread on an executor owned by the session,
+# so one user's long compare never queues another's; the in-flight job lives in
+# session_state too
+_POOL_KEY = "compare_pool"
+_JOB_KEY = "compare_job"
+
+
+def _submit(fn, *args):
+    """Run fn on this session's executor with the caller's script context, so st.cache_data works there."""
+    ctx = get_script_run_ctx()
+    if _POOL_KEY not in st.session_state:
+        # Two threads: a new compare can start while a superseded one winds down
+        st.session_state[_POOL_KEY] = ThreadPoolExecutor(max_workers=2)
+    pool = st.session_state[_POOL_KEY]
+
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+    return pool.submit(run)
+
+
+def _iter_events(payload: dict):
+    """Yield (event, data) pairs from the GET /backtest/compare_stream SSE feed."""
+    with httpx.stream("GET", f"{API_BASE}/backtest/compare_stream", params=payload, timeout=120) as resp:
+        resp.raise_for_status()
+        event = "message"
+        for line in resp.iter_lines():
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                yield event, orjson.loads(line[5:])
+                event = "message"
+
+
+def _by_sharpe(results: list) -> list:
+    return sorted(results, key=lambda r: r["sharpe_ratio"], reverse=True)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _compare_all(payload: dict, _progress: dict) -> list:
+    """
+    Stream every strategy's result and rank by Sharpe. `_progress` (underscore: not
+    part of the cache key) is filled as events arrive so the view can show them
+    early: "total" from the server's start event, "results" as each one lands.
+    Failed strategies are dropped; raises only if all fail.
+    """
+    results = _progress["results"]
+    errors = []
+    for event, data in _iter_events(payload):
+        if event == "start":
+            _progress["total"] = len(data["strategies"])
+        elif event == "result":
+            results.append(data)
+        elif event == "error":
+            errors.append(f"{data['strategy']}: {data['detail']}")
+    if not results and errors:
+        raise RuntimeError("; ".join(errors))
+    return _by_sharpe(results)
+
+
+def _render_leaderboard(results: list):
+    # Columnar frame (one list per column); percentages are scaled once and
+    # formatted by the column config rather than per cell in Python
+    leaderboard = pd.DataFrame({
+        "Rank": [MEDALS[i] if i < len(MEDALS) else str(i+1) for i in range(len(results))],
+        "Strategy": [r["strategy_name"].replace("_", " ").title() for r in results],
+        "Total Return": [r["total_return"] * 100 for r in results],
+        "vs Benchmark": [r["alpha"] * 100 for r in results],
+        "Sharpe": [r["sharpe_ratio"] for r in results],
+        "Sortino": [r["sortino_ratio"] for r in results],
+        "Max Drawdown": [r["max_drawdown"] * 100 for r in results],
+        "Win Rate": [r["win_rate"] * 100 for r in results],
+        "Trades": [r["total_trades"] for r in results],
+    })
+    st.dataframe(
+        leaderboard,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Total Return": st.column_config.NumberColumn(format="%+.1f%%"),
+            "vs Benchmark": st.column_config.NumberColumn(format="%+.1f%%"),
+            "Sharpe": st.column_config.NumberColumn(format="%.2f"),
+            "Sortino": st.column_config.NumberColumn(format="%.2f"),
+            "Max Drawdown": st.column_config.NumberColumn(format="%.1f%%"),
+            "Win Rate": st.column_config.NumberColumn(format="%.1f%%"),
+        },
+    )
+
+
+def _render_results(results: list, capital: float):
+    st.divider()
+
+    # Leaderboard
+    st.subheader("🏆 Strategy Leaderboard")
+    _render_leaderboard(results)
+
+    # Combined equity curves
+    st.subheader("📈 All Strategies vs BTC Benchmark")
+    colors = ["#6c63ff", "#00c853", "#ff9800", "#f44336"]
+    # Build every trace first and construct the figure once, so plotly validates a
+    # single figure instead of re-validating on each add_trace
+    curves = [(i, r["equity_curve"]) for i, r in enumerate(results) if (r.get("equity_curve") or {}).get("dates")]
+    traces = [
+        go.Scatter(
+            x=equity["dates"], y=equity["values"],
+            name=results[i]["strategy_name"].replace("_", " ").title(),
+            line=dict(color=colors[i % len(colors)], width=2),
+        )
+        for i, equity in curves
+    ]
+    if curves:
+        equity = curves[0][1]
+        traces.insert(1, go.Scatter(
+            x=equity["dates"], y=equity["benchmarks"],
+            name="BTC Buy & Hold",
+            line=dict(color="#aaaaaa", width=2, dash="dash"),
+        ))
+
+    fig = go.Figure(data=traces, layout=go.Layout(
+        height=450,
+        hovermode="x unified",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02),
+        margin=dict(t=30, b=0),
+        # Initial-capital reference line (what add_hline would add)
+        shapes=[dict(
+            type="line", xref="paper", x0=0, x1=1, y0=capital, y1=capital,
+            line=dict(color="gray", dash="dot"), opacity=0.4,
+        )],
+    ))
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Side-by-side metric cards
+    st.subheader("📊 Detailed Metrics")
+    cols = st.columns(len(results))
+    for i, (col, r) in enumerate(zip(cols, results)):
+        with col:
+            medal = MEDALS[i] if i < len(MEDALS) else ""
+            st.markdown(f"**{medal} {r['strategy_name'].replace('_', ' ').title()}**")
+            st.metric("Total Return", f"{r['total_return']:+.1%}")
+            st.metric("Sharpe", f"{r['sharpe_ratio']:.2f}")
+            st.metric("Max DD", f"{r['max_drawdown']:.1%}")
+            st.metric("Win Rate", f"{r['win_rate']:.1%}")
+
+
+def _render_intro():
+    st.divider()
+    st.markdown("### Select a coin in the sidebar and click Compare to run all 4 strategies head-to-head.")
+    st.markdown("""
+This view runs all strategies simultaneously on the same coin and time period, then ranks them by **Sharpe ratio** (risk-adjusted return).
+
+**Benchmark:** BTC buy-and-hold (or ETH if testing BTC)
+    """)
 
 
 def render():
@@ -22,7 +186,7 @@ def render():
 
     with st.sidebar:
         st.subheader("Compare Config")
-        selected_label = st.selectbox("Coin", list(POPULAR_COINS.keys()))
+        selected_label = st.selectbox("Coin", _COIN_LABELS)
         coin_id = POPULAR_COINS[selected_label]
         custom_coin = st.text_input("Or CoinGecko ID", placeholder="polkadot")
         if custom_coin:
@@ -34,101 +198,48 @@ def render():
         run = st.button("⚖️ Compare All Strategies", type="primary")
 
     if run:
-        with st.spinner("Running all 4 strategies..."):
-            try:
-                params = {"coingecko_id": coin_id, "initial_capital": capital}
-                if start_date:
-                    params["start_date"] = str(start_date)
-                if end_date:
-                    params["end_date"] = str(end_date)
-
-                resp = requests.post(f"{API_BASE}/backtest/compare", params=params, timeout=120)
-                resp.raise_for_status()
-                results = resp.json()
-            except Exception as e:
-                st.error(f"API error: {e}")
-                return
-
-        if not results:
-            st.error("No results returned.")
-            return
-
-        st.divider()
-
-        # Leaderboard
-        st.subheader("🏆 Strategy Leaderboard")
-        medals = ["🥇", "🥈", "🥉", "4️⃣"]
-        leaderboard = []
-        for i, r in enumerate(results):
-            leaderboard.append({
-                "Rank": medals[i] if i < len(medals) else str(i+1),
-                "Strategy": r["strategy_name"].replace("_", " ").title(),
-                "Total Return": f"{r['total_return']:+.1%}",
-                "vs Benchmark": f"{r['alpha']:+.1%}",
-                "Sharpe": f"{r['sharpe_ratio']:.2f}",
-                "Sortino": f"{r['sortino_ratio']:.2f}",
-                "Max Drawdown": f"{r['max_drawdown']:.1%}",
-                "Win Rate": f"{r['win_rate']:.1%}",
-                "Trades": r["total_trades"],
-            })
-
-        df = pd.DataFrame(leaderboard)
-        st.dataframe(df, use_container_width=True, hide_index=True)
-
-        # Combined equity curves
-        st.subheader("📈 All Strategies vs BTC Benchmark")
-        colors = ["#6c63ff", "#00c853", "#ff9800", "#f44336"]
-        fig = go.Figure()
-
-        bench_added = False
-        for i, r in enumerate(results):
-            equity = r.get("equity_curve", [])
-            if not equity:
-                continue
-            dates = [e["date"] for e in equity]
-            values = [e["value"] for e in equity]
-            bench = [e["benchmark_value"] for e in equity]
-
-            strategy_name = r["strategy_name"].replace("_", " ").title()
-            fig.add_trace(go.Scatter(
-                x=dates, y=values,
-                name=strategy_name,
-                line=dict(color=colors[i % len(colors)], width=2)
-            ))
-
-            if not bench_added:
-                fig.add_trace(go.Scatter(
-                    x=dates, y=bench,
-                    name="BTC Buy & Hold",
-                    line=dict(color="#aaaaaa", width=2, dash="dash")
-                ))
-                bench_added = True
-
-        fig.add_hline(y=capital, line_dash="dot", line_color="gray", opacity=0.4)
-        fig.update_layout(
-            height=450,
-            hovermode="x unified",
-            legend=dict(orientation="h", yanchor="bottom", y=1.02),
-            margin=dict(t=30, b=0),
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Side-by-side metric cards
-        st.subheader("📊 Detailed Metrics")
-        cols = st.columns(len(results))
-        for i, (col, r) in enumerate(zip(cols, results)):
-            with col:
-                medal = medals[i] if i < len(medals) else ""
-                st.markdown(f"**{medal} {r['strategy_name'].replace('_', ' ').title()}**")
-                st.metric("Total Return", f"{r['total_return']:+.1%}")
-                st.metric("Sharpe", f"{r['sharpe_ratio']:.2f}")
-                st.metric("Max DD", f"{r['max_drawdown']:.1%}")
-                st.metric("Win Rate", f"{r['win_rate']:.1%}")
-    else:
-        st.divider()
-        st.markdown("### Select a coin in the sidebar and click Compare to run all 4 strategies head-to-head.")
-        st.markdown("""
-This view runs all strategies simultaneously on the same coin and time period, then ranks them by **Sharpe ratio** (risk-adjusted return).
-
-**Benchmark:** BTC buy-and-hold (or ETH if testing BTC)
-        """)
+        payload = {
+            "coingecko_id": coin_id,
+            "initial_capital": capital,
+            "start_date": str(start_date or DEFAULT_START),
+            "max_points": CHART_POINTS,
+        }
+        if end_date:
+            payload["end_date"] = str(end_date)
+        progress = {"total": None, "results": []}
+        st.session_state[_JOB_KEY] = (payload, _submit(_compare_all, payload, progress), time.time(), progress)
+
+    # The job outlives reruns: touching a widget while it runs re-attaches to the
+    # same future instead of losing it, and finished results stay on screen
+    job = st.session_state.get(_JOB_KEY)
+    if job is None:
+        _render_intro()
+        return
+
+    payload, future, started, progress = job
+    if not future.done():
+        with st.status("Running strategies...", expanded=True) as status:
+            board = st.empty()
+            shown = 0
+            while not future.done():
+                time.sleep(0.2)
+                partial = progress["results"]
+                if len(partial) != shown:
+                    shown = len(partial)
+                    with board.container():
+                        _render_leaderboard(_by_sharpe(partial))
+                total = progress["total"] or "?"
+                status.update(label=f"Running strategies... {shown}/{total} done, {time.time() - started:.0f}s")
+            status.update(label="Strategies finished", state="complete", expanded=False)
+
+    try:
+        results = future.result()
+    except Exception as e:
+        st.error(f"API error: {e}")
+        return
+
+    if not results:
+        st.error("No results returned.")
+        return
+
+    _render_results(results, payload["initial_capital"])
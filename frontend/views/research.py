@@ -1,6 +1,13 @@
 """frontend/views/research.py"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import requests
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import plotly.graph_objects as go
 
 API_BASE = "http://localhost:8000"
@@ -15,6 +22,41 @@ POPULAR_COINS = {
     "Avalanche (AVAX)": "avalanche-2",
     "Dogecoin (DOGE)": "dogecoin",
 }
+_COIN_LABELS = list(POPULAR_COINS)  # selectbox options, built once per process
+
+# Keep-alive session shared by every call from this view
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(
+    pool_connections=8, pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.1),
+))
+_POOL = ThreadPoolExecutor(max_workers=2)
+
+
+def _submit(fn, *args):
+    """Run fn on the pool with the caller's script context, so st.cache_data works there."""
+    ctx = get_script_run_ctx()
+
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+    return _POOL.submit(run)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_signals(coin_id: str) -> dict:
+    """Signal summary for a coin; cached across reruns (errors are not cached)."""
+    resp = _SESSION.get(f"{API_BASE}/signals/{coin_id}", timeout=30)
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_brief(coin_id: str, question: str) -> dict:
+    """Claude brief for a coin/question; cached across reruns (errors are not cached)."""
+    params = {"question": question} if question else {}
+    resp = _SESSION.get(f"{API_BASE}/analyze/{coin_id}", params=params, timeout=60)
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
 
 
 def render():
@@ -23,7 +65,7 @@ def render():
 
     col1, col2 = st.columns([1, 2])
     with col1:
-        selected_label = st.selectbox("Select Coin", list(POPULAR_COINS.keys()))
+        selected_label = st.selectbox("Select Coin", _COIN_LABELS)
         coin_id = POPULAR_COINS[selected_label]
         custom_coin = st.text_input("Or enter CoinGecko ID", placeholder="e.g. polkadot, chainlink")
         if custom_coin:
@@ -41,24 +83,24 @@ def render():
     with col_b:
         signals_only = st.button("📊 Signal Scorecard Only")
 
+    if generate:
+        # Start the Claude brief now so it overlaps the scorecard fetch below
+        brief_future = _submit(_fetch_brief, coin_id, question)
+
     if signals_only or generate:
         # Load signals
         with st.spinner(f"Loading signals for {coin_id}..."):
             try:
-                resp = requests.get(f"{API_BASE}/signals/{coin_id}", timeout=30)
-                resp.raise_for_status()
-                data = resp.json()
+                data = _fetch_signals(coin_id)
             except requests.exceptions.HTTPError as e:
                 if e.response.status_code == 404:
                     st.warning(f"No signals found for **{coin_id}**. Seeding data first...")
                     try:
-                        seed_resp = requests.post(f"{API_BASE}/coins/{coin_id}/seed", timeout=60)
+                        seed_resp = _SESSION.post(f"{API_BASE}/coins/{coin_id}/seed", timeout=60)
                         seed_resp.raise_for_status()
-                        comp_resp = requests.post(f"{API_BASE}/signals/{coin_id}/compute", timeout=60)
+                        comp_resp = _SESSION.post(f"{API_BASE}/signals/{coin_id}/compute", timeout=60)
                         comp_resp.raise_for_status()
-                        resp = requests.get(f"{API_BASE}/signals/{coin_id}", timeout=30)
-                        resp.raise_for_status()
-                        data = resp.json()
+                        data = _fetch_signals(coin_id)
                         st.success("Data seeded successfully!")
                     except Exception as seed_err:
                         st.error(f"Could not seed {coin_id}: {seed_err}")
@@ -154,10 +196,15 @@ def render():
         st.subheader("🤖 AI Research Brief")
         with st.spinner("Claude is analyzing the data..."):
             try:
-                params = {"question": question} if question else {}
-                resp = requests.get(f"{API_BASE}/analyze/{coin_id}", params=params, timeout=60)
-                resp.raise_for_status()
-                brief_data = resp.json()
+                try:
+                    brief_data = brief_future.result()
+                except requests.exceptions.HTTPError as e:
+                    # Only a 404 means the brief raced a first-time seed above; ask again
+                    # now that signals exist. Anything else (e.g. a failed Claude call)
+                    # is surfaced rather than paid for twice.
+                    if e.response is None or e.response.status_code != 404:
+                        raise
+                    brief_data = _fetch_brief(coin_id, question)
                 st.markdown(brief_data["brief"])
                 st.caption(f"Generated at {brief_data['generated_at']}")
             except Exception as e:
@@ -2,10 +2,13 @@
 CryptoLens — AI-Powered Crypto Research Platform
 """
 import logging
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.core.config import get_settings
+from app.core.gzip import GZipMiddleware
 from app.models.schemas import HealthResponse
 
 logging.basicConfig(level=logging.INFO)
@@ -15,15 +18,22 @@ app = FastAPI(
     title="CryptoLens API",
     description="AI-powered crypto research with quantitative signals",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+# Explicit origins/methods/headers let browsers cache the preflight (max_age) instead
+# of repeating OPTIONS before every JSON POST
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=list(settings.cors_origins),
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
+    max_age=86400,
 )
+# Equity curves and trade logs are large, repetitive JSON; small bodies and event
+# streams skip compression
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 from app.api import coins, signals, backtest, research
 
@@ -36,3 +46,20 @@ app.include_router(research.router, prefix="/analyze", tags=["Research"])
 @app.get("/health", response_model=HealthResponse)
 def health_check():
     return HealthResponse(status="ok", env=settings.env)
+
+
+if __name__ == "__main__":
+    # Production entrypoint: `python main.py`. uvloop + httptools are the C event
+    # loop and HTTP parser shipped with uvicorn[standard]. One worker by default:
+    # each worker process has its own in-memory caches, and a seed/compute only
+    # invalidates the worker that handled it (see app/core/cache.py).
+    import uvicorn
+
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", 8000)),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.environ.get("WEB_CONCURRENCY", 1)),
+    )
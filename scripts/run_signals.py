@@ -5,39 +5,65 @@ Usage:
     python scripts/run_signals.py --coin bitcoin ethereum
 """
 import sys, os, argparse
+from concurrent.futures import ProcessPoolExecutor
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, engine
 from app.services.signals import SignalEngine
 
 
+def _init_worker():
+    # Forked workers must not reuse the parent's pooled connections
+    engine.dispose(close=False)
+
+
+def _work(coin_id: str) -> str:
+    """Compute + summarise one coin in a worker process; returns the report text."""
+    lines = [f"\nComputing signals for {coin_id}..."]
+    db = SessionLocal()
+    try:
+        signals = SignalEngine(db)
+        rows = signals.compute_and_store(coin_id)
+        summary = signals.get_signal_summary(coin_id)
+        score = summary["composite_score"]
+        signal = summary["signal"]
+        price = summary["price_usd"]
+        ind = summary["indicators"]
+        rsi = ind.get("rsi_14")
+        rsi = f"{rsi:.1f}" if rsi is not None else "N/A"
+        lines += [
+            f"  Stored {rows} rows",
+            f"  {'='*50}",
+            f"  {coin_id.upper()}  |  ${price:,.2f}  |  {signal}",
+            f"  Composite Score: {score:+.3f}",
+            f"  RSI-14: {rsi}  |  Fear & Greed: {ind.get('fear_greed_index', 'N/A')} ({ind.get('fear_greed_label', 'N/A')})",
+            f"  {'='*50}",
+        ]
+    except Exception as e:
+        lines.append(f"  ✗ Error: {e}")
+    finally:
+        db.close()
+    return "\n".join(lines)
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--coin", nargs="+", required=True)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
 
-    db = SessionLocal()
-    engine = SignalEngine(db)
-
-    for coin_id in args.coin:
-        print(f"\nComputing signals for {coin_id}...")
-        try:
-            rows = engine.compute_and_store(coin_id.lower())
-            summary = engine.get_signal_summary(coin_id.lower())
-            score = summary["composite_score"]
-            signal = summary["signal"]
-            price = summary["price_usd"]
-            ind = summary["indicators"]
-            print(f"  Stored {rows} rows")
-            print(f"  {'='*50}")
-            print(f"  {coin_id.upper()}  |  ${price:,.2f}  |  {signal}")
-            print(f"  Composite Score: {score:+.3f}")
-            print(f"  RSI-14: {ind.get('rsi_14', 'N/A'):.1f}  |  Fear & Greed: {ind.get('fear_greed_index', 'N/A')} ({ind.get('fear_greed_label', 'N/A')})")
-            print(f"  {'='*50}")
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-
-    db.close()
+    coins = list(dict.fromkeys(c.strip().lower() for c in args.coin if c.strip()))
+    if not coins:
+        print("No coins given.")
+        return
+
+    # Coins are independent: one process (and DB session) per coin at a time.
+    # Reports are printed in input order once each coin finishes.
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(coins)), initializer=_init_worker) as pool:
+        for report in pool.map(_work, coins):
+            print(report)
 
 
 if __name__ == "__main__":
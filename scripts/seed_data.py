@@ -5,35 +5,47 @@ Usage:
     python scripts/seed_data.py --coin bitcoin ethereum solana
     python scripts/seed_data.py --coin bitcoin --days 730
 """
-import sys, os, argparse, time
+import sys, os, argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.db.session import SessionLocal, init_db
 from app.services.ingestion import IngestionService
 
 
+def seed_coin(coin_id: str, days: int) -> int:
+    """Fetch one coin with its own DB session (sessions are not thread-safe)."""
+    db = SessionLocal()
+    try:
+        return IngestionService(db).fetch_price_history(coin_id, days=days)
+    finally:
+        db.close()
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--coin", nargs="+", required=True)
     parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--workers", type=int, default=4)
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
 
     init_db()
-    db = SessionLocal()
-    svc = IngestionService(db)
-
-    for i, coin_id in enumerate(args.coin):
-        if i > 0:
-            print("  Waiting 8s to avoid rate limiting...")
-            time.sleep(8)
-        print(f"\nSeeding {coin_id}...")
-        try:
-            rows = svc.fetch_price_history(coin_id.lower(), days=args.days)
-            print(f"  ✓ {rows} rows inserted for {coin_id}")
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-
-    db.close()
+    coins = list(dict.fromkeys(c.strip().lower() for c in args.coin if c.strip()))
+
+    # CoinGecko calls are throttled inside IngestionService, so workers only
+    # overlap network/DB time and never exceed the per-minute budget
+    print(f"\nSeeding {len(coins)} coin(s) with {args.workers} workers...")
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(seed_coin, coin_id, args.days): coin_id for coin_id in coins}
+        for future in as_completed(futures):
+            coin_id = futures[future]
+            try:
+                print(f"  ✓ {future.result()} rows inserted for {coin_id}")
+            except Exception as e:
+                print(f"  ✗ {coin_id}: {e}")
+
     print("\nDone!")
 
 
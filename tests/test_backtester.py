@@ -0,0 +1,183 @@
+"""
+Pins the vectorized backtest simulation, trade log and threshold strategies
+against the original pandas implementations they replaced.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services._bt_loops import _threshold_state_loop, _threshold_state_vectorized
+from app.services.backtester import BacktestEngine
+
+
+# ------------------------------------------------------------------
+# Reference (pandas) implementations
+# ------------------------------------------------------------------
+
+def _reference_simulate_portfolio(prices, signals, initial_capital, commission, slippage):
+    close = prices["close"]
+    signals = signals.reindex(close.index).fillna(0)
+    position_changes = signals.diff().fillna(signals)
+    entries = position_changes > 0
+    exits = position_changes < 0
+    # pct_change's old default fill_method="pad", spelled out
+    asset_returns = close.ffill().pct_change(fill_method=None).fillna(0)
+    cost = (commission + slippage) * (entries | exits).astype(float)
+    strategy_returns = signals.shift(1).fillna(0) * asset_returns - cost
+    portfolio_value = initial_capital * (1 + strategy_returns).cumprod()
+
+    return pd.DataFrame({
+        "close": close,
+        "position": signals,
+        "asset_return": asset_returns,
+        "strategy_return": strategy_returns,
+        "portfolio_value": portfolio_value,
+        "is_entry": entries,
+        "is_exit": exits,
+    })
+
+
+def _reference_trade_log(portfolio):
+    trades = []
+    entry_date = entry_price = None
+    for idx, row in portfolio.iterrows():
+        if row["is_entry"] and entry_date is None:
+            entry_date, entry_price = idx, row["close"]
+        elif row["is_exit"] and entry_date is not None:
+            trade_return = (row["close"] - entry_price) / entry_price
+            trades.append({
+                "entry_date": str(entry_date.date()),
+                "exit_date": str(idx.date()),
+                "entry_price": round(float(entry_price), 6),
+                "exit_price": round(float(row["close"]), 6),
+                "return": round(float(trade_return), 6),
+                "duration_days": (idx - entry_date).days,
+                "profitable": trade_return > 0,
+            })
+            entry_date = entry_price = None
+
+    if entry_date is not None:
+        last_idx = portfolio.index[-1]
+        last_price = float(portfolio["close"].iloc[-1])
+        trade_return = (last_price - entry_price) / entry_price
+        trades.append({
+            "entry_date": str(entry_date.date()),
+            "exit_date": str(last_idx.date()),
+            "entry_price": round(float(entry_price), 6),
+            "exit_price": round(float(last_price), 6),
+            "return": round(float(trade_return), 6),
+            "duration_days": (last_idx - entry_date).days,
+            "profitable": trade_return > 0,
+        })
+    return trades
+
+
+def _reference_threshold_positions(x, low, high):
+    position = np.zeros(len(x), dtype=np.uint8)
+    in_position = False
+    for i in range(len(x)):
+        if not in_position and x[i] < low:
+            in_position = True
+        elif in_position and x[i] > high:
+            in_position = False
+        position[i] = 1 if in_position else 0
+    return position
+
+
+# ------------------------------------------------------------------
+# Fixtures
+# ------------------------------------------------------------------
+
+def _prices(n=400, seed=7, flat=(100, 140), gap=None):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    if flat:
+        close[flat[0]:flat[1]] = close[flat[0]]
+    if gap:
+        close[gap[0]:gap[1]] = np.nan
+    index = pd.date_range("2022-01-01", periods=n, freq="D")
+    return pd.DataFrame({"close": close}, index=index)
+
+
+def _signals(index, seed=11, open_at_end=False):
+    rng = np.random.default_rng(seed)
+    # Runs of 0/1 with random lengths, including long flat-position stretches
+    values = np.repeat(rng.integers(0, 2, len(index)), rng.integers(1, 30, len(index)))[:len(index)]
+    values[-1] = 1 if open_at_end else 0
+    return pd.Series(values.astype(float), index=index)
+
+
+CASES = {
+    "random": dict(),
+    "flat_prices": dict(flat=(0, 60)),
+    "nan_prices": dict(gap=(200, 215)),
+    "leading_nan": dict(gap=(0, 5)),
+}
+
+
+# ------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("open_at_end", [False, True])
+def test_simulate_portfolio_matches_pandas(case, open_at_end):
+    prices = _prices(**CASES[case])
+    signals = _signals(prices.index, open_at_end=open_at_end)
+
+    got = BacktestEngine._simulate_portfolio(prices, signals, 10_000.0, 0.001, 0.001)
+    expected = _reference_simulate_portfolio(prices, signals, 10_000.0, 0.001, 0.001)
+
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_simulate_portfolio_reindexes_sparse_signals():
+    prices = _prices()
+    signals = _signals(prices.index).iloc[::3]
+    signals.iloc[5] = np.nan
+
+    got = BacktestEngine._simulate_portfolio(prices, signals, 5_000.0, 0.002, 0.0)
+    expected = _reference_simulate_portfolio(prices, signals, 5_000.0, 0.002, 0.0)
+
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("open_at_end", [False, True])
+def test_trade_log_matches_pandas(case, open_at_end):
+    prices = _prices(**CASES[case])
+    signals = _signals(prices.index, open_at_end=open_at_end)
+    portfolio = _reference_simulate_portfolio(prices, signals, 10_000.0, 0.001, 0.001)
+
+    got = BacktestEngine._build_trade_log(portfolio)
+    expected = _reference_trade_log(portfolio)
+
+    assert len(got) == len(expected) > 0
+    for g, e in zip(got, expected):
+        assert g.keys() == e.keys()
+        for key in g:
+            if isinstance(e[key], float) and np.isnan(e[key]):
+                assert np.isnan(g[key]), key
+            else:
+                assert g[key] == e[key], key
+
+
+def test_trade_log_edge_cases():
+    index = pd.date_range("2023-01-01", periods=6, freq="D")
+    prices = pd.DataFrame({"close": [10.0, 11.0, 12.0, 11.0, 13.0, 14.0]}, index=index)
+
+    for values in ([0, 0, 0, 0, 0, 0], [1, 1, 1, 1, 1, 1], [0, 1, 0, 1, 0, 1], [1, 0, 0, 0, 0, 0]):
+        portfolio = _reference_simulate_portfolio(prices, pd.Series(values, index=index, dtype=float), 1.0, 0, 0)
+        assert BacktestEngine._build_trade_log(portfolio) == _reference_trade_log(portfolio), values
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_threshold_positions_match_loop(seed):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0, 100, 500)
+    x[100:150] = 50.0   # flat inside the band
+    x[300:320] = np.nan
+
+    expected = _reference_threshold_positions(x, 30, 70)
+    np.testing.assert_array_equal(_threshold_state_loop(x, 30, 70), expected)
+    np.testing.assert_array_equal(_threshold_state_vectorized(x, 30, 70), expected)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from app.services.downsample import downsample_equity_curve, lttb_indices
+
+
+def _curve(n, seed=5):
+    rng = np.random.default_rng(seed)
+    values = (10_000 * np.cumprod(1 + rng.normal(0, 0.02, n))).tolist()
+    return {
+        "dates": [f"d{i}" for i in range(n)],
+        "values": values,
+        "benchmarks": [v / 2 for v in values],
+    }
+
+
+@pytest.mark.parametrize("n, max_points", [(1000, 100), (1000, 3), (501, 500), (2000, 1999)])
+def test_lttb_keeps_endpoints_and_max_points(n, max_points):
+    y = _curve(n)["values"]
+    idx = lttb_indices(np.arange(n, dtype=np.float64), np.asarray(y), max_points)
+
+    assert len(idx) == max_points
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_keeps_the_peak():
+    y = np.zeros(1000)
+    y[437] = 50.0
+    idx = lttb_indices(np.arange(1000, dtype=np.float64), y, 50)
+    assert 437 in idx
+
+
+def test_downsample_keeps_series_aligned():
+    curve = _curve(1000)
+    out = downsample_equity_curve(curve, 200)
+
+    assert set(out) == set(curve)
+    assert all(len(series) == 200 for series in out.values())
+    assert out["dates"][0] == "d0" and out["dates"][-1] == "d999"
+    assert out["values"][-1] == curve["values"][-1]
+    for date, value, bench in zip(out["dates"], out["values"], out["benchmarks"]):
+        i = int(date[1:])
+        assert value == curve["values"][i] and bench == curve["benchmarks"][i]
+
+
+def test_downsample_short_curve_unchanged():
+    curve = _curve(50)
+    assert downsample_equity_curve(curve, 200) is curve
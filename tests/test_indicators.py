@@ -0,0 +1,73 @@
+"""
+Pins the compiled indicator kernels against the pandas path in
+SignalEngine._compute_all_signals.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import signals as signals_module
+from app.services._indicator_kernels import INDICATOR_NAMES, compute_indicators, compute_indicators_batch
+from app.services.signals import SignalEngine
+
+
+def _closes(n=400, seed=3, flat=None, gap=None):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    if flat:
+        close[flat[0]:flat[1]] = close[flat[0]]
+    if gap:
+        close[gap[0]:gap[1]] = np.nan
+    index = pd.date_range("2022-01-01", periods=n, freq="D")
+    return pd.DataFrame({"close": close}, index=index)
+
+
+def _pandas_signals(prices, monkeypatch):
+    monkeypatch.setattr(signals_module, "NUMBA_AVAILABLE", False)
+    engine = SignalEngine(db=None, ingestion=object())
+    return engine._compute_all_signals(prices, pd.DataFrame())
+
+
+@pytest.mark.parametrize("flat", [None, (0, 40), (150, 260), (370, 400)])
+def test_kernels_match_pandas(flat, monkeypatch):
+    prices = _closes(flat=flat)
+    expected = _pandas_signals(prices, monkeypatch)[INDICATOR_NAMES]
+
+    got = pd.DataFrame(
+        compute_indicators(prices["close"].to_numpy(dtype=np.float64)),
+        index=prices.index, columns=INDICATOR_NAMES,
+    )
+
+    pd.testing.assert_frame_equal(got, expected, check_exact=False, rtol=1e-9, atol=1e-9)
+
+
+def test_short_series_is_all_warmup(monkeypatch):
+    prices = _closes(n=10)
+    expected = _pandas_signals(prices, monkeypatch)[INDICATOR_NAMES]
+
+    got = compute_indicators(prices["close"].to_numpy(dtype=np.float64))
+
+    np.testing.assert_allclose(got, expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("gap", [(0, 5), (200, 215)])
+def test_nan_closes_take_the_pandas_path(gap, monkeypatch):
+    prices = _closes(gap=gap)
+    got = SignalEngine(db=None, ingestion=object())._compute_all_signals(prices, pd.DataFrame())
+    expected = _pandas_signals(prices, monkeypatch)
+
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_batch_matches_single():
+    series = [_closes(n=n, seed=n)["close"].to_numpy() for n in (260, 400, 30)]
+    lengths = np.array([len(s) for s in series])
+    closes = np.full((len(series), lengths.max()), np.nan)
+    for k, s in enumerate(series):
+        closes[k, :len(s)] = s
+
+    out = compute_indicators_batch(closes, lengths)
+
+    for k, s in enumerate(series):
+        np.testing.assert_allclose(out[k, :len(s)], compute_indicators(s), rtol=1e-12, atol=1e-12)
+        assert np.isnan(out[k, len(s):]).all()
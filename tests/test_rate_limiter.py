@@ -0,0 +1,55 @@
+import time
+
+from requests import Response
+
+from app.services.ingestion import RateLimiter
+
+
+def _response(status_code, **headers):
+    resp = Response()
+    resp.status_code = status_code
+    resp.headers.update(headers)
+    resp.url = "https://api.example.test/coins"
+    return resp
+
+
+def _timed_acquire(limiter):
+    start = time.monotonic()
+    limiter.acquire()
+    return time.monotonic() - start
+
+
+def test_429_with_retry_after_pauses_acquire():
+    limiter = RateLimiter(calls=100, period=60.0)
+    limiter.acquire()
+
+    limiter.observe(_response(429, **{"Retry-After": "0.3"}))
+
+    assert _timed_acquire(limiter) >= 0.25
+    # The pause is over; the next slot is immediate
+    assert _timed_acquire(limiter) < 0.1
+
+
+def test_exhausted_remaining_pauses_acquire():
+    limiter = RateLimiter(calls=100, period=60.0)
+    limiter.observe(_response(200, **{"X-RateLimit-Remaining": "0", "Retry-After": "0.2"}))
+    assert _timed_acquire(limiter) >= 0.15
+
+
+def test_429_without_retry_after_backs_off_up_to_period():
+    limiter = RateLimiter(calls=100, period=0.3)
+    limiter.observe(_response(429))
+    assert _timed_acquire(limiter) >= 0.25
+
+
+def test_ok_response_does_not_pause():
+    limiter = RateLimiter(calls=100, period=60.0)
+    limiter.observe(_response(200, **{"X-RateLimit-Remaining": "42"}))
+    assert _timed_acquire(limiter) < 0.1
+
+
+def test_sliding_window_blocks_until_slot_frees():
+    limiter = RateLimiter(calls=2, period=0.3)
+    limiter.acquire()
+    limiter.acquire()
+    assert _timed_acquire(limiter) >= 0.25